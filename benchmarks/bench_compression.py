@@ -0,0 +1,69 @@
+# Benchmark: bytes saved vs CPU spent by the DTN pre-encryption compression stage.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_compression
+
+import json
+import os
+import random
+import time
+
+from routing_modes.compression import (
+    AdaptiveCompressor, CANDIDATES, CODEC_NAMES, _compressor
+)
+
+LINKS_BPS = [256_000, 1_000_000, 10_000_000, 100_000_000]
+
+
+def make_datasets(size: int = 512 * 1024) -> dict:
+    rng = random.Random(7)
+    levels = ["INFO", "WARN", "DEBUG", "ERROR"]
+    log = "".join(
+        f"2025-01-{rng.randint(1, 28):02d} {levels[rng.randint(0, 3)]} relay node-{rng.randint(0, 999)} "
+        f"forwarded {rng.randint(1, 65535)} bytes in {rng.random() * 50:.2f} ms\n"
+        for _ in range(size // 70)
+    ).encode()[:size]
+    records = json.dumps([
+        {"peer": f"node-{i}", "score": rng.randint(0, 150), "latency_ms": round(rng.random() * 200, 2)}
+        for i in range(size // 60)
+    ]).encode()[:size]
+    return {
+        "log text": log,
+        "json": records,
+        "random (encrypted-like)": os.urandom(size),
+    }
+
+
+def time_codec(data: bytes, codec: int, level: int) -> tuple:
+    start = time.perf_counter()
+    compressor = _compressor(codec, level)
+    size = len(compressor.compress(data)) + len(compressor.flush())
+    return size, time.perf_counter() - start
+
+
+def main():
+    datasets = make_datasets()
+    adaptive = AdaptiveCompressor()
+
+    print(f"{'dataset':<24}{'codec':<10}{'ratio':>8}{'saved KB':>10}{'cpu ms':>9}")
+    for name, data in datasets.items():
+        for codec, level in CANDIDATES:
+            size, seconds = time_codec(data, codec, level)
+            label = f"{CODEC_NAMES[codec]}-{level}"
+            print(f"{name:<24}{label:<10}{len(data) / size:>8.2f}{(len(data) - size) / 1024:>10.1f}"
+                  f"{seconds * 1000:>9.1f}")
+    print()
+
+    print(f"{'dataset':<24}{'link':>10}  {'adaptive choice':<16}{'ratio':>8}{'cpu ms':>9}{'tx ms saved':>13}")
+    for name, data in datasets.items():
+        for link_bps in LINKS_BPS:
+            start = time.perf_counter()
+            codec, payload = adaptive.compress(data, link_bps)
+            seconds = time.perf_counter() - start
+            saved_tx = (len(data) - len(payload)) * 8 / link_bps
+            print(f"{name:<24}{link_bps / 1e6:>8.2f}M  {CODEC_NAMES[codec]:<16}"
+                  f"{len(data) / len(payload):>8.2f}{seconds * 1000:>9.1f}{saved_tx * 1000:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
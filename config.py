@@ -1 +1,104 @@
-# Entry point
+# Module: config
+# config.py
+
+import json
+import os
+
+ENV_PREFIX = "OBSCURANET_"  # e.g. OBSCURANET_NODE_ID, OBSCURANET_MODES="low-latency,onion"
+
+
+class NodeSettings:
+    """
+    Typed settings for a node daemon.
+    Values are resolved in order: built-in defaults < settings file < environment < explicit overrides.
+    """
+
+    # Field name -> (type, default). The type drives parsing of file/env values.
+    FIELDS = {
+        "node_id": (str, "obscura-node"),
+        "modes": (list, ["low-latency"]),     # Routing modes this node serves
+        "preload_modes": (bool, False),       # Import every mode at startup instead of on first use
+        "ui": (bool, False),                  # Launch the desktop UI
+        "pow_difficulty": (int, 4),
+        "metrics_enabled": (bool, True),
+        "trace_sample_rate": (float, 0.0),
+        "data_dir": (str, "~/.obscuranet"),   # Identity + peer store; empty string = ephemeral node
+        "store_key": (str, ""),               # Passphrase sealing stored session keys (OBSCURANET_STORE_KEY)
+        "status_interval": (float, 30.0)      # Seconds between status lines in the run loop (0 = off)
+    }
+
+    def __init__(self, **values):
+        """
+        Create settings from keyword arguments; unspecified fields take their defaults.
+        Raises ValueError on unknown fields or values that cannot be converted.
+        """
+        unknown = set(values) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown setting(s): {', '.join(sorted(unknown))}")
+
+        for name, (kind, default) in self.FIELDS.items():
+            value = values.get(name, default)
+            setattr(self, name, _coerce(name, kind, value))
+
+    def to_dict(self) -> dict:
+        """
+        Returns all settings as a plain dictionary.
+        """
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @staticmethod
+    def from_dict(data: dict):
+        """
+        Build settings from a dictionary (e.g. a parsed settings file).
+        """
+        return NodeSettings(**data)
+
+
+def _coerce(name: str, kind: type, value):
+    """
+    Convert a raw value (from a file, the environment or code) to the field's type.
+    """
+    try:
+        if kind is bool and isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered not in ("1", "0", "true", "false", "yes", "no", "on", "off"):
+                raise ValueError(value)
+            return lowered in ("1", "true", "yes", "on")
+        if kind is list:
+            if isinstance(value, str):
+                return [item.strip() for item in value.split(",") if item.strip()]
+            return list(value)
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for setting '{name}': {value!r}")
+
+
+def load_settings(path: str = None, env: dict = None, overrides: dict = None) -> NodeSettings:
+    """
+    Resolve node settings from file, environment and explicit overrides.
+
+    Parameters:
+    - path: optional JSON settings file
+    - env: environment mapping to read OBSCURANET_* variables from (default: os.environ)
+    - overrides: values that win over everything else (e.g. command-line flags)
+
+    Returns:
+    - NodeSettings instance
+    """
+    values = {}
+
+    if path:
+        with open(os.path.expanduser(path)) as fh:
+            values.update(json.load(fh))
+
+    env = os.environ if env is None else env
+    for name in NodeSettings.FIELDS:
+        raw = env.get(ENV_PREFIX + name.upper())
+        if raw is not None:
+            values[name] = raw
+
+    for name, value in (overrides or {}).items():
+        if value is not None:
+            values[name] = value
+
+    return NodeSettings.from_dict(values)
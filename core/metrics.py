@@ -0,0 +1,218 @@
+# Module: metrics
+# metrics.py
+
+import json
+import time
+from functools import wraps
+
+HISTOGRAM_BUCKETS = 40  # Bucket i holds samples in [2^(i-1), 2^i) ns; the last bucket is open-ended (~9 min+)
+
+
+class Counter:
+    """
+    A monotonically increasing counter.
+    Increments are plain integer adds without a lock: under the GIL this never corrupts
+    the value, and the rare lost update under heavy thread contention is acceptable for statistics.
+    """
+
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        """
+        Increase the counter by `amount` (default 1).
+        """
+        self.value += amount
+
+    def reset(self):
+        self.value = 0
+
+
+class Histogram:
+    """
+    Fixed-bucket, log2-scale latency histogram over nanosecond samples.
+    Recording a sample is one bit_length() and one list increment, with no allocation.
+    """
+
+    __slots__ = ("name", "buckets", "count", "total", "min", "max")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def observe(self, value_ns: int):
+        """
+        Record a single sample (in nanoseconds).
+        """
+        index = value_ns.bit_length()
+        if index >= HISTOGRAM_BUCKETS:
+            index = HISTOGRAM_BUCKETS - 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value_ns
+        if self.min is None or value_ns < self.min:
+            self.min = value_ns
+        if value_ns > self.max:
+            self.max = value_ns
+
+    def percentile(self, q: float) -> int:
+        """
+        Approximate the q-th percentile (0-100) from the buckets.
+        Interpolates linearly inside the bucket that holds the percentile, with the
+        bucket bounds narrowed to the observed min/max.
+        """
+        if self.count == 0:
+            return 0
+        rank = max(1, int(round(self.count * q / 100.0)))
+        seen = 0
+        for index, hits in enumerate(self.buckets):
+            if seen + hits >= rank:
+                low = max(1 << (index - 1) if index else 0, self.min)
+                high = min((1 << index) - 1 if index else 0, self.max)
+                if high <= low:
+                    return high
+                return low + (high - low) * (rank - seen) // hits
+            seen += hits
+        return self.max
+
+    def snapshot(self) -> dict:
+        """
+        Returns a plain-dict copy of the histogram (safe to serialize).
+        """
+        return {
+            "count": self.count,
+            "sum_ns": self.total,
+            "min_ns": self.min or 0,
+            "max_ns": self.max,
+            "mean_ns": self.total // self.count if self.count else 0,
+            "p50_ns": self.percentile(50),
+            "p90_ns": self.percentile(90),
+            "p99_ns": self.percentile(99),
+            "buckets": list(self.buckets)
+        }
+
+    def reset(self):
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry of named counters and latency histograms.
+
+    Hot paths guard on `enabled` before touching the clock, so a disabled registry
+    costs one attribute check per instrumented call.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.counters = {}      # {name: Counter}
+        self.histograms = {}    # {name: Histogram}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def counter(self, name: str) -> Counter:
+        """
+        Returns the counter called `name`, creating it on first use.
+        """
+        counter = self.counters.get(name)
+        if counter is None:
+            counter = self.counters.setdefault(name, Counter(name))
+        return counter
+
+    def histogram(self, name: str) -> Histogram:
+        """
+        Returns the histogram called `name`, creating it on first use.
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(name, Histogram(name))
+        return histogram
+
+    def inc(self, name: str, amount: int = 1):
+        """
+        Increment a counter if metrics are enabled.
+        """
+        if self.enabled:
+            self.counter(name).inc(amount)
+
+    def start(self) -> int:
+        """
+        Returns a start timestamp for observe_since(), or 0 if metrics are disabled.
+        """
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def observe_since(self, name: str, start_ns: int):
+        """
+        Record the time elapsed since `start_ns` (from start()) into histogram `name`.
+        A start of 0 means metrics were disabled when timing began, so nothing is recorded.
+        """
+        if start_ns:
+            self.histogram(name).observe(time.perf_counter_ns() - start_ns)
+
+    def snapshot(self) -> dict:
+        """
+        Returns a point-in-time copy of every counter and histogram.
+        """
+        return {
+            "enabled": self.enabled,
+            "counters": {name: c.value for name, c in list(self.counters.items())},
+            "histograms": {name: h.snapshot() for name, h in list(self.histograms.items())}
+        }
+
+    def export_json(self) -> str:
+        """
+        Returns the snapshot serialized as JSON (for logging or scraping).
+        """
+        return json.dumps(self.snapshot(), sort_keys=True)
+
+    def reset(self):
+        """
+        Zero every metric while keeping the registered names.
+        """
+        for counter in list(self.counters.values()):
+            counter.reset()
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+
+
+METRICS = MetricsRegistry()  # Shared registry used by all instrumented modules
+
+
+def timed(name: str, registry: MetricsRegistry = METRICS):
+    """
+    Decorator that records each call's duration into histogram `name`
+    and counts calls in counter `name`. When the registry is disabled the
+    wrapper calls straight through without reading the clock.
+    """
+    def decorator(func):
+        histogram = registry.histogram(name)
+        counter = registry.counter(name)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter_ns() - start_ns)
+                counter.inc()
+
+        return wrapper
+    return decorator
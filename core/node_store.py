@@ -0,0 +1,215 @@
+# Module: node_store
+# node_store.py
+
+import hashlib
+import mmap
+import os
+import struct
+
+from core.metrics import METRICS
+from crypto_engine.chacha import ChaCha20Encryptor
+from crypto_engine.hash_utils import derive_key_hkdf
+from core.secure_node import SecureNode
+
+IDENTITY_FILE = "identity.key"   # 32-byte raw X25519 private key, mode 0600
+PEERS_FILE = "peers.db"          # Fixed-size peer records, see PeerStore
+
+PEER_STORE_MAGIC = b"OBPS"
+PEER_STORE_VERSION = 1
+
+# magic, version, record size, record count
+HEADER = struct.Struct("<4sHHI")
+# peer id (utf-8, NUL-padded), public key, nonce, sealed session key (32 + 16-byte tag),
+# reputation, last seen (unix time), flags
+RECORD = struct.Struct("<64s32s12s48sidB")
+MAX_PEER_ID_BYTES = 64
+
+FLAG_HAS_SESSION = 0x01
+STORE_SECRET_SALT = b"ObscuraNet Peer Store Secret"
+
+
+class PeerRecord:
+    """
+    Persisted state for one peer.
+    """
+
+    __slots__ = ("peer_id", "public_key", "session_key", "reputation", "last_seen")
+
+    def __init__(self, peer_id: str, public_key: bytes, session_key: bytes = None,
+                 reputation: int = 100, last_seen: float = 0.0):
+        self.peer_id = peer_id
+        self.public_key = public_key
+        self.session_key = session_key
+        self.reputation = reputation
+        self.last_seen = last_seen
+
+
+class PeerStore:
+    """
+    Compact on-disk table of known peers.
+
+    The file is a small header followed by fixed-size records, so a load is a single
+    mmap + struct.iter_unpack over the whole table. Session keys are sealed with
+    ChaCha20-Poly1305 under `storage_key` (see NodeStore.peer_store); the peer id and
+    public key are bound in as associated data so records cannot be swapped.
+    Saves rewrite the file to a temporary name and atomically replace it.
+    """
+
+    def __init__(self, path: str, storage_key: bytes):
+        self.path = path
+        self.sealer = ChaCha20Encryptor(key=storage_key)
+
+    def load(self) -> list:
+        """
+        Read every record.
+
+        Returns:
+        - List of PeerRecord (empty if the store does not exist yet)
+        Records whose session key fails to unseal are kept without a session key.
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size:
+            return []
+
+        records = []
+        with open(self.path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            magic, version, record_size, count = HEADER.unpack_from(view, 0)
+            if magic != PEER_STORE_MAGIC or version != PEER_STORE_VERSION or record_size != RECORD.size:
+                raise ValueError(f"Unsupported peer store format in {self.path}")
+
+            end = HEADER.size + count * RECORD.size
+            if end > len(view):
+                raise ValueError(f"Peer store {self.path} is truncated")
+
+            # Unpack straight from the mapping; the views must be released before the mmap closes
+            with memoryview(view) as mapped, mapped[HEADER.size:end] as table:
+                for raw_id, public_key, nonce, sealed, reputation, last_seen, flags in RECORD.iter_unpack(table):
+                    peer_id = raw_id.rstrip(b"\x00").decode()
+                    session_key = None
+                    if flags & FLAG_HAS_SESSION:
+                        try:
+                            session_key = self.sealer.decrypt(sealed, nonce, aad=raw_id + public_key)
+                        except Exception:
+                            session_key = None  # Wrong identity or corrupted record: force a new handshake
+                    records.append(PeerRecord(peer_id, public_key, session_key, reputation, last_seen))
+
+        return records
+
+    def save(self, records: list) -> int:
+        """
+        Write all records, replacing the existing store atomically.
+        Peers whose id does not fit a record (over MAX_PEER_ID_BYTES) are left out rather
+        than failing the whole table; they will simply handshake again after a restart.
+
+        Returns:
+        - Number of records skipped
+        """
+        encoded = [(record, record.peer_id.encode()) for record in records]
+        kept = [(record, raw_id) for record, raw_id in encoded if len(raw_id) <= MAX_PEER_ID_BYTES]
+        skipped = len(encoded) - len(kept)
+        if skipped:
+            METRICS.inc("node_store.peers_skipped", skipped)
+
+        buffer = bytearray(HEADER.size + len(kept) * RECORD.size)
+        HEADER.pack_into(buffer, 0, PEER_STORE_MAGIC, PEER_STORE_VERSION, RECORD.size, len(kept))
+
+        offset = HEADER.size
+        for record, raw_id in kept:
+            raw_id = raw_id.ljust(MAX_PEER_ID_BYTES, b"\x00")
+
+            if record.session_key is not None:
+                sealed = self.sealer.encrypt(record.session_key, aad=raw_id + record.public_key)
+                nonce, ciphertext, flags = sealed["nonce"], sealed["ciphertext"], FLAG_HAS_SESSION
+            else:
+                nonce, ciphertext, flags = bytes(12), bytes(48), 0
+
+            RECORD.pack_into(buffer, offset, raw_id, record.public_key, nonce, ciphertext,
+                             int(record.reputation), float(record.last_seen), flags)
+            offset += RECORD.size
+
+        tmp_path = self.path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(buffer)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.path)
+        return skipped
+
+
+class NodeStore:
+    """
+    Persists a node's identity and peer table under `data_dir`, so a restarted node
+    keeps its public key and resumes sessions without redoing discovery or handshakes.
+
+    Session keys in the peer store are sealed under a key derived from the identity and,
+    if given, a storage secret. Without a secret, the identity file sits next to the peer
+    store, so anyone who can read the directory can unseal the session keys: sealing then
+    only binds each key to its record and does not keep it confidential.
+    """
+
+    def __init__(self, data_dir: str, storage_secret: str = None):
+        """
+        Parameters:
+        - data_dir: directory holding the identity and peer store
+        - storage_secret: passphrase mixed into the peer-store key (e.g. OBSCURANET_STORE_KEY);
+          stretched with scrypt once, here
+        """
+        self.data_dir = os.path.expanduser(data_dir)
+        self.storage_secret = None
+        if storage_secret:
+            self.storage_secret = hashlib.scrypt(storage_secret.encode(), salt=STORE_SECRET_SALT,
+                                                 n=2 ** 14, r=8, p=1, dklen=32)
+
+    def load_identity(self) -> bytes:
+        """
+        Returns the persisted private key, creating and saving a new one on first run.
+        """
+        path = os.path.join(self.data_dir, IDENTITY_FILE)
+        if os.path.exists(path):
+            with open(path, "rb") as fh:
+                private_key = fh.read()
+            if len(private_key) != 32:
+                raise ValueError(f"Identity file {path} is corrupted")
+            return private_key
+
+        from crypto_engine.key_exchange import Curve25519KeyExchange
+        private_key = Curve25519KeyExchange().get_private_bytes()
+        os.makedirs(self.data_dir, mode=0o700, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(private_key)
+        return private_key
+
+    def peer_store(self, private_key: bytes) -> PeerStore:
+        storage_key = derive_key_hkdf(shared_secret=private_key, salt=self.storage_secret or b"",
+                                      info=b"ObscuraNet Peer Store")
+        return PeerStore(os.path.join(self.data_dir, PEERS_FILE), storage_key)
+
+    def load_node(self, node_id: str) -> SecureNode:
+        """
+        Create a SecureNode with the persisted identity and bulk-restore its peers and sessions.
+        """
+        private_key = self.load_identity()
+        node = SecureNode(node_id, private_key=private_key)
+        for record in self.peer_store(private_key).load():
+            node.restore_peer(record.peer_id, record.public_key, record.session_key,
+                              record.reputation, record.last_seen)
+        return node
+
+    def save_node(self, node: SecureNode):
+        """
+        Persist the node's peers, session keys, peer reputation and last-seen times.
+        Returns the number of peers that could not be stored (see PeerStore.save).
+        """
+        records = [
+            PeerRecord(
+                peer_id,
+                public_key,
+                node.session_keys.get(peer_id),
+                node.peer_reputation.get(peer_id, 100),
+                node.peer_last_seen.get(peer_id, 0.0)
+            )
+            for peer_id, public_key in list(node.peers.items())
+        ]
+        os.makedirs(self.data_dir, mode=0o700, exist_ok=True)
+        return self.peer_store(node.kex.get_private_bytes()).save(records)
@@ -8,7 +8,8 @@ class Packet:
     A packet carries encrypted data along with metadata for routing, tracking, and analysis.
     """
 
-    def __init__(self, sender_id: str, receiver_id: str, payload: bytes, is_dummy=False, mode="low-latency"):
+    def __init__(self, sender_id: str, receiver_id: str, payload: bytes, is_dummy=False, mode="low-latency",
+                 metadata: dict = None):
         """
         Create a new packet.
 
@@ -18,6 +19,7 @@ class Packet:
         - payload: Encrypted message or dummy data (bytes)
         - is_dummy: Boolean indicating whether this is a dummy (decoy) packet
         - mode: Routing mode — e.g., "low-latency", "onion", "dtn"
+        - metadata: Optional routing/diagnostic fields (e.g. "trace_id" for sampled tracing)
         """
         self.packet_id = str(uuid.uuid4())       # Unique ID for tracking
         self.timestamp = int(time.time())         # Time packet was created
@@ -26,6 +28,7 @@ class Packet:
         self.payload = payload                    # Encrypted or dummy content
         self.is_dummy = is_dummy                  # True if this is a fake packet for obfuscation
         self.mode = mode                          # Routing mode
+        self.metadata = metadata if metadata is not None else {}  # Extra fields (trace id, ...)
 
     def to_dict(self) -> dict:
         """
@@ -41,7 +44,8 @@ class Packet:
             "receiver_id": self.receiver_id,
             "payload": self.payload,
             "is_dummy": self.is_dummy,
-            "mode": self.mode
+            "mode": self.mode,
+            "metadata": dict(self.metadata)
         }
 
     @staticmethod
@@ -60,7 +64,8 @@ class Packet:
             receiver_id=data["receiver_id"],
             payload=data["payload"],
             is_dummy=data.get("is_dummy", False),
-            mode=data.get("mode", "low-latency")
+            mode=data.get("mode", "low-latency"),
+            metadata=dict(data.get("metadata") or {})
         )
         pkt.packet_id = data.get("packet_id", str(uuid.uuid4()))
         pkt.timestamp = data.get("timestamp", int(time.time()))
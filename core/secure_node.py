@@ -1,8 +1,15 @@
+import os
+import time
 from crypto_engine.chacha import ChaCha20Encryptor
 from crypto_engine.key_exchange import Curve25519KeyExchange
 from crypto_engine.hash_utils import compute_sha3_256, derive_key_hkdf
 from pow_system.adaptive_pow import AdaptivePoW
 from pow_system.reputation_manager import ReputationManager
+from core.metrics import METRICS
+from core.tracing import TRACER
+from router.latency_router import RoutingCostModel, split_utf8
+
+DEFAULT_LINK_LATENCY = 0.05  # Seconds assumed for a peer with no latency measurements
 
 class SecureNode:
     """
@@ -11,19 +18,26 @@ class SecureNode:
     adaptive proof-of-work, and trust-based reputation scoring.
     """
 
-    def __init__(self, node_id: str):
+    def __init__(self, node_id: str, private_key: bytes = None):
         """
         Initializes the node with a unique identifier.
-        Generates Curve25519 key pair and initializes internal modules.
+        Generates a Curve25519 key pair (or loads `private_key`, a persisted identity)
+        and initializes internal modules.
         """
         self.node_id = node_id                                # Unique identity for the node
-        self.kex = Curve25519KeyExchange()                    # Key exchange system
+        self.kex = Curve25519KeyExchange(private_key)         # Key exchange system
         self.public_key = self.kex.get_public_bytes()         # Public key to share with peers
         self.shared_key = None                                # Session key derived from ECDH + HKDF
         self.encryptor = None                                 # Encryptor for secure messaging
         self.pow = AdaptivePoW()                              # Proof-of-work engine
         self.reputation = ReputationManager(node_id)          # Reputation tracking for trust
         self.peers = {}                                       # Stores known peers {peer_id: public_key}
+        self.session_keys = {}                                # Derived session keys {peer_id: key}
+        self.peer_reputation = {}                             # Observed peer scores {peer_id: score}
+        self.peer_last_seen = {}                              # {peer_id: unix time of last session use}
+        self.link_latency = {}                                # Smoothed one-way latency {peer_id: seconds}
+        self.route_model = RoutingCostModel()                 # Cost model behind send_auto()
+        self.status_feed = None                               # StatusFeed, created by subscribe_status()
 
     def get_public_key(self) -> bytes:
         """
@@ -38,22 +52,90 @@ class SecureNode:
         - Generates a shared ECDH secret
         - Derives a session key using HKDF
         - Initializes the ChaCha20 encryptor
+
+        A session key already derived for the same peer key (e.g. restored from the
+        peer store after a restart) is reused instead of repeating ECDH + HKDF.
         """
-        self.peers[peer_id] = peer_public_key
-        
-        # Step 1: Perform ECDH key exchange
-        raw_shared = self.kex.generate_shared_key(peer_public_key)
+        is_new = peer_id not in self.peers
+        session_key = self.session_keys.get(peer_id)
+        if session_key is None or self.peers.get(peer_id) != peer_public_key:
+            # Step 1: Perform ECDH key exchange
+            raw_shared = self.kex.generate_shared_key(peer_public_key)
+
+            # Step 2: Derive a uniform session key using HKDF (SHA3-256)
+            session_key = derive_key_hkdf(shared_secret=raw_shared)
+            self.session_keys[peer_id] = session_key
 
-        # Step 2: Derive a uniform session key using HKDF (SHA3-256)
-        self.shared_key = derive_key_hkdf(shared_secret=raw_shared)
+        self.peers[peer_id] = peer_public_key
+        self.peer_last_seen[peer_id] = time.time()
+        self.shared_key = session_key
+        if self.status_feed is not None:
+            fields = {"last_seen": self.peer_last_seen[peer_id]}
+            if is_new:
+                fields["reputation"] = self.peer_reputation.get(peer_id, 100)
+                fields["latency"] = self.link_latency.get(peer_id)  # May have been measured before the handshake
+            self.status_feed.peer_updated(peer_id, fields)
 
         # Step 3: Use the derived key in our AEAD encryption engine
         self.encryptor = ChaCha20Encryptor(key=self.shared_key)
 
-    def send_message(self, message: str, aad: bytes = b"") -> dict:
+    def use_session(self, peer_id: str):
+        """
+        Make the session with a known peer the active one before encrypting for it.
+        Cheap for peers with a cached session key. Raises if the peer is unknown.
+        """
+        if peer_id not in self.peers:
+            raise Exception(f"No session with '{peer_id}'. Establish session first.")
+        if self.encryptor is not None and self.shared_key == self.session_keys.get(peer_id):
+            return  # Already the active session
+        self.establish_session(peer_id, self.peers[peer_id])
+
+    def restore_peer(self, peer_id: str, peer_public_key: bytes, session_key: bytes = None,
+                     reputation: int = None, last_seen: float = None):
+        """
+        Re-register a peer from persisted state without performing a handshake.
+        The active encryptor is left unchanged; establish_session() switches to the
+        restored session without redoing ECDH.
+        """
+        self.peers[peer_id] = peer_public_key
+        if session_key is not None:
+            self.session_keys[peer_id] = session_key
+        if reputation is not None:
+            self.peer_reputation[peer_id] = reputation
+        if last_seen is not None:
+            self.peer_last_seen[peer_id] = last_seen
+        if self.status_feed is not None:
+            self.status_feed.peer_updated(peer_id, {
+                "reputation": self.peer_reputation.get(peer_id, 100),
+                "last_seen": self.peer_last_seen.get(peer_id),
+                "latency": self.link_latency.get(peer_id)
+            })
+
+    def set_peer_reputation(self, peer_id: str, score: int):
+        """
+        Record the observed reputation score of a peer.
+        """
+        self.peer_reputation[peer_id] = score
+        if self.status_feed is not None and peer_id in self.peers:  # Unknown peers have no row to update
+            self.status_feed.peer_updated(peer_id, {"reputation": score})
+
+    def remove_peer(self, peer_id: str):
+        """
+        Forget a peer: its public key, session key, score and latency measurements.
+        """
+        self.peers.pop(peer_id, None)
+        self.session_keys.pop(peer_id, None)
+        self.peer_reputation.pop(peer_id, None)
+        self.peer_last_seen.pop(peer_id, None)
+        self.link_latency.pop(peer_id, None)
+        if self.status_feed is not None:
+            self.status_feed.peer_removed(peer_id)
+
+    def send_message(self, message: str, aad: bytes = b"", trace_id: str = None) -> dict:
         """
         Encrypts a plaintext message using ChaCha20-Poly1305 and wraps it as a packet.
         Includes SHA3-256 hash for message integrity.
+        If `trace_id` is given, the encryption is recorded as a "node.encrypt" span.
 
         Returns:
         - A dictionary representing a secure message packet
@@ -61,37 +143,138 @@ class SecureNode:
         if not self.encryptor:
             raise Exception("Session not established. Cannot encrypt.")
 
-        encrypted = self.encryptor.encrypt(plaintext=message.encode(), aad=aad)
+        with TRACER.span(trace_id, "node.encrypt", node_id=self.node_id, size=len(message)):
+            encrypted = self.encryptor.encrypt(plaintext=message.encode(), aad=aad)
 
-        return {
-            "from": self.node_id,
-            "nonce": encrypted["nonce"],
-            "aad": encrypted["aad"],
-            "ciphertext": encrypted["ciphertext"],
-            "hash": compute_sha3_256(encrypted["ciphertext"]),
-        }
+            return {
+                "from": self.node_id,
+                "nonce": encrypted["nonce"],
+                "aad": encrypted["aad"],
+                "ciphertext": encrypted["ciphertext"],
+                "hash": compute_sha3_256(encrypted["ciphertext"]),
+            }
 
-    def receive_message(self, packet: dict) -> str:
+    def receive_message(self, packet: dict, trace_id: str = None) -> str:
         """
         Decrypts a message packet and verifies its integrity.
         Raises an exception if tampering is detected.
+        If `trace_id` is given, the work is recorded as a "node.decrypt" span.
         """
         if not self.encryptor:
             raise Exception("Session not established. Cannot decrypt.")
 
-        # Verify integrity using SHA3-256
-        expected_hash = compute_sha3_256(packet["ciphertext"])
-        if expected_hash != packet["hash"]:
-            raise Exception("Message integrity compromised! Hash mismatch.")
+        with TRACER.span(trace_id, "node.decrypt", node_id=self.node_id, size=len(packet["ciphertext"])):
+            # Verify integrity using SHA3-256
+            expected_hash = compute_sha3_256(packet["ciphertext"])
+            if expected_hash != packet["hash"]:
+                raise Exception("Message integrity compromised! Hash mismatch.")
+
+            # Decrypt and return plaintext
+            decrypted = self.encryptor.decrypt(
+                ciphertext=packet["ciphertext"],
+                nonce=packet["nonce"],
+                aad=packet["aad"]
+            )
+
+            return decrypted.decode()
 
-        # Decrypt and return plaintext
-        decrypted = self.encryptor.decrypt(
-            ciphertext=packet["ciphertext"],
-            nonce=packet["nonce"],
-            aad=packet["aad"]
+    def record_link_latency(self, peer_id: str, latency: float, alpha: float = 0.2):
+        """
+        Fold a measured one-way latency (seconds) to `peer_id` into its smoothed estimate.
+        Status subscribers only hear about known peers; the estimate of any other peer
+        is published with its row once a session is established.
+        """
+        previous = self.link_latency.get(peer_id)
+        self.link_latency[peer_id] = latency if previous is None else previous + alpha * (latency - previous)
+        if self.status_feed is not None and peer_id in self.peers:
+            self.status_feed.peer_updated(peer_id, {"latency": self.link_latency[peer_id]})
+
+    def send_auto(self, receiver_id: str, message: str, security_level: str = "low",
+                  path: list = None, network_map: dict = None) -> dict:
+        """
+        Send a message over whichever routing mode the cost model predicts is fastest
+        for its size, the required security level, the current PoW difficulty and the
+        measured link latency. Messages slightly over the low-latency limit are split
+        into several low-latency packets instead of being pushed into DTN; onion messages
+        longer than one cell are split across several cells.
+
+        Parameters:
+        - receiver_id: destination peer (must have an established session, unless it is
+          reached over the given onion path)
+        - security_level: "low", "normal" or "high" (high forces onion routing)
+        - path, network_map: onion route and node map; onion is only considered when given
+
+        Returns:
+        - Dictionary with "plan" (RoutePlan) and "packets" (list of Packet)
+        """
+        from routing_modes.low_latency import LowLatencyRouter
+        from routing_modes.onion_route_pow import OnionRouter
+        from routing_modes.opportunistic_dtn import DTNRouter
+
+        size = len(message.encode())
+        if receiver_id in self.peers or not (path and network_map):
+            # Encrypt for the receiver, not whichever peer's session was established last
+            self.use_session(receiver_id)
+            available = ("low-latency", "dtn", "onion") if path and network_map else ("low-latency", "dtn")
+        else:
+            available = ("onion",)  # No direct session: only the onion path can reach it
+        hops = len(path) - 1 if path else 0
+        trusted = bool(path) and all(self.pow.is_trusted(hop) for hop in path[1:])
+        first_hop = path[1] if path else receiver_id
+
+        plan = self.route_model.plan(
+            size,
+            security_level,
+            self.pow.get_current_difficulty(),
+            self.link_latency.get(first_hop, DEFAULT_LINK_LATENCY),
+            hops=hops,
+            trusted=trusted,
+            available=available
         )
+        METRICS.inc(f"dispatch.{plan.mode}")
+
+        if plan.mode == "onion":
+            packets = OnionRouter(self, network_map).create_onion_messages(path, message)
+        elif plan.mode == "dtn":
+            packets = DTNRouter(self).send_bulk(receiver_id, message)
+        else:
+            router = LowLatencyRouter(self)
+            chunks = split_utf8(message)
+            msg_id = os.urandom(8).hex()  # Lets the receiver group and order the pieces (ChunkReassembler)
+            packets = [router.send(receiver_id, chunk, metadata={"msg_id": msg_id, "chunk": i, "chunks": len(chunks)})
+                       for i, chunk in enumerate(chunks)]
+
+        return {"plan": plan, "packets": packets}
+
+    def record_delivery(self, plan, observed: float):
+        """
+        Report the measured delivery time (seconds) of a message sent with send_auto(),
+        so the cost model learns this node's real per-mode latencies.
+        """
+        self.route_model.observe(plan.mode, plan.raw_estimate, observed)
+
+    def encrypt_bytes(self, data: bytes, aad: bytes = b"", trace_id: str = None) -> bytes:
+        """
+        Encrypts raw bytes for transport and returns nonce (12 bytes) + ciphertext.
+        Used by routing modes that carry binary payloads; Poly1305 authenticates the result,
+        so no separate hash is attached.
+        """
+        if not self.encryptor:
+            raise Exception("Session not established. Cannot encrypt.")
+
+        with TRACER.span(trace_id, "node.encrypt", node_id=self.node_id, size=len(data)):
+            encrypted = self.encryptor.encrypt(plaintext=data, aad=aad)
+            return encrypted["nonce"] + encrypted["ciphertext"]
 
-        return decrypted.decode()
+    def decrypt_bytes(self, blob: bytes, aad: bytes = b"", trace_id: str = None) -> bytes:
+        """
+        Reverses encrypt_bytes(). Raises if the payload was tampered with.
+        """
+        if not self.encryptor:
+            raise Exception("Session not established. Cannot decrypt.")
+
+        with TRACER.span(trace_id, "node.decrypt", node_id=self.node_id, size=len(blob)):
+            return self.encryptor.decrypt(ciphertext=blob[12:], nonce=blob[:12], aad=aad)
 
     def get_status(self) -> dict:
         """
@@ -99,10 +282,35 @@ class SecureNode:
         - Reputation score
         - Current PoW difficulty
         - Connected peers
+        - Metrics snapshot (counters and latency histograms)
+
+        This rebuilds everything on each call; UIs that refresh continuously should use
+        subscribe_status() instead.
         """
         return {
             "node_id": self.node_id,
             "reputation": self.reputation.get_score(),
             "pow_difficulty": self.pow.get_current_difficulty(),
-            "connected_peers": list(self.peers.keys())
+            "connected_peers": list(self.peers.keys()),
+            "metrics": METRICS.snapshot()
         }
+
+    def subscribe_status(self, callback=None, min_interval: float = 0.5):
+        """
+        Subscribe to incremental status updates (see core.status_feed.StatusFeed).
+        The first delta is a full snapshot; later ones carry only peers added, changed or
+        removed, changed node fields and counter increments, at most once per `min_interval`.
+
+        Returns:
+        - Subscription (call poll() for pull-style consumers, close() to stop)
+        """
+        if self.status_feed is None:
+            from core.status_feed import StatusFeed
+            self.status_feed = StatusFeed(self)
+        return self.status_feed.subscribe(callback, min_interval)
+
+    def export_metrics(self) -> str:
+        """
+        Returns the current metrics snapshot as a JSON string.
+        """
+        return METRICS.export_json()
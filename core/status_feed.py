@@ -0,0 +1,207 @@
+# Module: status_feed
+# status_feed.py
+
+import time
+
+from core.metrics import METRICS
+
+# Counters reported as throughput deltas (routing modes, dispatch decisions, DTN and scheduler events)
+DEFAULT_COUNTER_PREFIXES = ("mode.", "dispatch.", "dtn.", "scheduler.")
+
+
+class Subscription:
+    """
+    One consumer of a StatusFeed. Peer changes accumulate here between deliveries,
+    coalesced per peer (the latest value of each field wins), so the cost of a delta
+    depends on how many peers changed, not on how many peers the node knows.
+    """
+
+    def __init__(self, feed, callback=None, min_interval: float = 0.5):
+        self.feed = feed
+        self.callback = callback          # Called with each delta by StatusFeed.tick(); None = poll() only
+        self.min_interval = min_interval  # Minimum seconds between two deltas
+        self.upserts = {}                 # {peer_id: {field: value}} added or changed since the last delta
+        self.removed = set()              # Peer ids removed since the last delta
+        self.full = True                  # Next delta is a complete snapshot (consumer starts from scratch)
+        self.node_state = {}              # Node fields as of the last delta
+        self.counters = feed.counter_values()  # Baseline: the first delta reports increments since subscribing
+        self.last_emit = None
+        self.seq = 0
+        self.active = True
+
+    def peer_updated(self, peer_id: str, fields: dict):
+        self.removed.discard(peer_id)
+        pending = self.upserts.get(peer_id)
+        if pending is None:
+            self.upserts[peer_id] = dict(fields)
+        else:
+            pending.update(fields)
+
+    def peer_removed(self, peer_id: str):
+        self.upserts.pop(peer_id, None)
+        self.removed.add(peer_id)
+
+    def poll(self, now: float = None, force: bool = False) -> dict:
+        """
+        Returns the changes since the last delta, or None if nothing changed or the
+        subscription is throttled (`force` skips the throttle).
+
+        Delta keys:
+        - seq, time, interval (seconds covered), full (True for the initial snapshot)
+        - peers: {peer_id: changed fields} to add or update
+        - peers_removed: [peer_id, ...]
+        - node: changed node fields (reputation, pow_difficulty, peer_count)
+        - counters: {counter name: increment since the last delta}
+        """
+        if not self.active:
+            return None
+        now = self.feed.clock() if now is None else now
+        if not force and self.last_emit is not None and now - self.last_emit < self.min_interval:
+            return None
+
+        node_state = self.feed.node_state()
+        node_changes = {key: value for key, value in node_state.items() if self.node_state.get(key) != value}
+        counters = self.feed.counter_values()
+        counter_changes = {}
+        for name, value in counters.items():
+            increment = value - self.counters.get(name, 0)
+            if increment:
+                counter_changes[name] = increment
+
+        if not (self.full or self.upserts or self.removed or node_changes or counter_changes):
+            return None
+
+        self.seq += 1
+        delta = {
+            "seq": self.seq,
+            "time": now,
+            "interval": now - self.last_emit if self.last_emit is not None else 0.0,
+            "full": self.full,
+            "peers": self.upserts,
+            "peers_removed": sorted(self.removed),
+            "node": node_changes,
+            "counters": counter_changes
+        }
+        self.upserts = {}
+        self.removed = set()
+        self.full = False
+        self.node_state = node_state
+        self.counters = counters
+        self.last_emit = now
+        return delta
+
+    def close(self):
+        """
+        Stop receiving updates.
+        """
+        self.feed.unsubscribe(self)
+
+
+class StatusFeed:
+    """
+    Publishes incremental node status to UIs and external consumers.
+
+    SecureNode reports each peer change as it happens (one dict update per subscriber);
+    scalar node fields and throughput counters are compared when a delta is built.
+    New subscribers start with one full snapshot, after which they only receive what changed.
+    Deltas are pushed to callbacks from tick(), or pulled with Subscription.poll().
+    """
+
+    def __init__(self, node, registry=METRICS, counter_prefixes: tuple = DEFAULT_COUNTER_PREFIXES,
+                 clock=time.monotonic):
+        """
+        Parameters:
+        - node: the SecureNode being observed
+        - registry: metrics registry the throughput counters are read from
+        - counter_prefixes: counters whose increments are reported
+        - clock: time source in seconds
+        """
+        self.node = node
+        self.registry = registry
+        self.counter_prefixes = counter_prefixes
+        self.clock = clock
+        self.subscriptions = []
+
+    @property
+    def min_interval(self) -> float:
+        """
+        Shortest throttle interval among subscribers (how often tick() is worth calling).
+        """
+        return min((sub.min_interval for sub in self.subscriptions), default=0.5)
+
+    def subscribe(self, callback=None, min_interval: float = 0.5) -> Subscription:
+        """
+        Register a consumer. Its first delta is a full snapshot of the peer table.
+
+        Parameters:
+        - callback: function called with each delta from tick(); None for poll()-based consumers
+        - min_interval: minimum seconds between deltas; changes in between are coalesced
+        """
+        subscription = Subscription(self, callback, min_interval)
+        for peer_id, fields in self.peer_snapshot().items():
+            subscription.upserts[peer_id] = fields
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.active = False
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    def peer_updated(self, peer_id: str, fields: dict):
+        """
+        Called by the node when a peer is added or one of its fields changes.
+        """
+        for subscription in self.subscriptions:
+            subscription.peer_updated(peer_id, fields)
+
+    def peer_removed(self, peer_id: str):
+        """
+        Called by the node when a peer is dropped.
+        """
+        for subscription in self.subscriptions:
+            subscription.peer_removed(peer_id)
+
+    def tick(self, now: float = None) -> int:
+        """
+        Deliver pending deltas to callback subscribers whose throttle interval has passed.
+
+        Returns:
+        - Number of deltas delivered
+        """
+        now = self.clock() if now is None else now
+        delivered = 0
+        for subscription in list(self.subscriptions):
+            if subscription.callback is None:
+                continue
+            delta = subscription.poll(now)
+            if delta is not None:
+                subscription.callback(delta)
+                delivered += 1
+        return delivered
+
+    def node_state(self) -> dict:
+        node = self.node
+        return {
+            "reputation": node.reputation.get_score(),
+            "pow_difficulty": node.pow.get_current_difficulty(),
+            "peer_count": len(node.peers)
+        }
+
+    def peer_snapshot(self) -> dict:
+        """
+        Returns {peer_id: fields} for every known peer (only used for new subscribers).
+        """
+        node = self.node
+        return {
+            peer_id: {
+                "reputation": node.peer_reputation.get(peer_id, 100),
+                "last_seen": node.peer_last_seen.get(peer_id),
+                "latency": node.link_latency.get(peer_id)
+            }
+            for peer_id in node.peers
+        }
+
+    def counter_values(self) -> dict:
+        return {name: counter.value for name, counter in list(self.registry.counters.items())
+                if name.startswith(self.counter_prefixes)}
@@ -0,0 +1,225 @@
+# Module: tracing
+# tracing.py
+
+import json
+import os
+import random
+import time
+from collections import deque
+
+
+class Span:
+    """
+    One timed stage in a packet's life (e.g. a single onion hop or a DTN fragment decrypt).
+    """
+
+    __slots__ = ("trace_id", "name", "node_id", "start_ns", "duration_ns", "attrs")
+
+    def __init__(self, trace_id: str, name: str, node_id: str, start_ns: int, duration_ns: int, attrs: dict):
+        self.trace_id = trace_id
+        self.name = name
+        self.node_id = node_id
+        self.start_ns = start_ns
+        self.duration_ns = duration_ns
+        self.attrs = attrs
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "node_id": self.node_id,
+            "start_ns": self.start_ns,
+            "duration_ns": self.duration_ns,
+            "attrs": self.attrs
+        }
+
+
+class _ActiveSpan:
+    """
+    Context manager that times a block and appends the resulting Span to the tracer's ring buffer.
+    """
+
+    __slots__ = ("tracer", "trace_id", "name", "node_id", "attrs", "start_ns")
+
+    def __init__(self, tracer, trace_id: str, name: str, node_id: str, attrs: dict):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.name = name
+        self.node_id = node_id
+        self.attrs = attrs
+        self.start_ns = 0
+
+    def set(self, key: str, value):
+        """
+        Attach an extra attribute to the span (shown under "args" in the export).
+        """
+        self.attrs[key] = value
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter_ns() - self.start_ns
+        if exc_type is not None:
+            self.attrs.setdefault("error", exc_type.__name__)
+        self.tracer.buffer.append(
+            Span(self.trace_id, self.name, self.node_id, self.start_ns, duration, self.attrs)
+        )
+        return False
+
+
+class _NullSpan:
+    """
+    Shared no-op span returned for unsampled packets.
+    """
+
+    __slots__ = ()
+
+    def set(self, key: str, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Sampled per-packet tracer.
+
+    A sampled packet carries its trace id in `Packet.metadata["trace_id"]`; every stage that
+    handles the packet records a Span under that id into a fixed-size ring buffer.
+    Unsampled packets get a shared no-op span, so tracing costs one dict lookup when off.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, capacity: int = 8192):
+        """
+        Parameters:
+        - sample_rate: fraction of new packets to trace (0.0 = none, 1.0 = all)
+        - capacity: maximum number of spans kept; the oldest are dropped first
+        """
+        self.sample_rate = 0.0
+        self.set_sample_rate(sample_rate)
+        self.buffer = deque(maxlen=capacity)  # Ring buffer of Span objects
+
+    def set_sample_rate(self, sample_rate: float):
+        """
+        Change the sampling rate at runtime. Affects only packets created afterwards.
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("Sample rate must be between 0.0 and 1.0.")
+        self.sample_rate = sample_rate
+
+    def sample(self) -> str:
+        """
+        Make a sampling decision for a new packet.
+
+        Returns:
+        - A fresh trace id if the packet should be traced, otherwise None
+        """
+        rate = self.sample_rate
+        if rate and (rate >= 1.0 or random.random() < rate):
+            return os.urandom(8).hex()
+        return None
+
+    @staticmethod
+    def trace_id_of(packet) -> str:
+        """
+        Returns the trace id carried by a Packet, or None if it is not sampled.
+        """
+        return packet.metadata.get("trace_id")
+
+    def span(self, trace_id: str, name: str, node_id: str = "", **attrs):
+        """
+        Time a block as one stage of the given trace.
+
+        Usage:
+            with TRACER.span(trace_id, "onion.hop", node_id=hop):
+                ...
+
+        Returns a no-op context manager when trace_id is None.
+        """
+        if trace_id is None:
+            return _NULL_SPAN
+        return _ActiveSpan(self, trace_id, name, node_id, attrs)
+
+    def spans(self, trace_id: str = None) -> list:
+        """
+        Returns the buffered spans, optionally filtered to a single trace.
+        """
+        spans = list(self.buffer)
+        if trace_id is None:
+            return spans
+        return [span for span in spans if span.trace_id == trace_id]
+
+    def export_chrome_trace(self, trace_id: str = None) -> dict:
+        """
+        Convert buffered spans into Chrome trace-event format (load in chrome://tracing or Perfetto).
+        Each trace becomes a process and each node a thread, so one packet's path reads as a timeline.
+
+        Parameters:
+        - trace_id: export only this trace (default: every buffered trace)
+
+        Returns:
+        - Dictionary with a "traceEvents" list
+        """
+        events = []
+        pids = {}   # {trace_id: pid}
+        tids = {}   # {(pid, node_id): tid}
+
+        for span in self.spans(trace_id):
+            pid = pids.get(span.trace_id)
+            if pid is None:
+                pid = pids[span.trace_id] = len(pids) + 1
+                events.append({
+                    "name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                    "args": {"name": f"trace {span.trace_id}"}
+                })
+
+            tid = tids.get((pid, span.node_id))
+            if tid is None:
+                tid = tids[(pid, span.node_id)] = len(tids) + 1
+                events.append({
+                    "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                    "args": {"name": span.node_id or "local"}
+                })
+
+            args = dict(span.attrs)
+            args["trace_id"] = span.trace_id
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": span.start_ns / 1000.0,      # Chrome expects microseconds
+                "dur": span.duration_ns / 1000.0,
+                "pid": pid,
+                "tid": tid,
+                "args": args
+            })
+
+        return {"traceEvents": events, "displayTimeUnit": "ns"}
+
+    def export_chrome_trace_json(self, path: str = None, trace_id: str = None) -> str:
+        """
+        Serialize export_chrome_trace() to JSON and optionally write it to `path`.
+        """
+        data = json.dumps(self.export_chrome_trace(trace_id))
+        if path:
+            with open(path, "w") as fh:
+                fh.write(data)
+        return data
+
+    def clear(self):
+        """
+        Drop all buffered spans.
+        """
+        self.buffer.clear()
+
+
+TRACER = Tracer()  # Shared tracer used by SecureNode and the routing modes
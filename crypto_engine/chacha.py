@@ -3,6 +3,7 @@
 
 from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
 import os
+from core.metrics import timed
 
 class ChaCha20Encryptor:
     """
@@ -24,6 +25,7 @@ class ChaCha20Encryptor:
 
         self.aead = ChaCha20Poly1305(self.key)  # AEAD = Authenticated Encryption with Associated Data
 
+    @timed("crypto.encrypt")
     def encrypt(self, plaintext: bytes, aad: bytes = b"") -> dict:
         """
         Encrypts the given plaintext using ChaCha20-Poly1305.
@@ -46,6 +48,7 @@ class ChaCha20Encryptor:
             "aad": aad
         }
 
+    @timed("crypto.decrypt")
     def decrypt(self, ciphertext: bytes, nonce: bytes, aad: bytes = b"") -> bytes:
         """
         Decrypts the given ciphertext using ChaCha20-Poly1305.
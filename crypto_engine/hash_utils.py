@@ -4,7 +4,9 @@
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.backends import default_backend
+from core.metrics import timed
 
+@timed("crypto.sha3_256")
 def compute_sha3_256(data: bytes) -> str:
     """
     Computes a SHA3-256 hash of the input data.
@@ -10,11 +10,15 @@ class Curve25519KeyExchange:
     using Curve25519 (based on Elliptic Curve Diffie-Hellman).
     """
 
-    def __init__(self):
+    def __init__(self, private_bytes: bytes = None):
         """
         Generates a private/public key pair upon initialization.
+        If `private_bytes` (32 raw bytes) is given, that persisted key is loaded instead.
         """
-        self.private_key = x25519.X25519PrivateKey.generate()
+        if private_bytes is not None:
+            self.private_key = x25519.X25519PrivateKey.from_private_bytes(private_bytes)
+        else:
+            self.private_key = x25519.X25519PrivateKey.generate()
         self.public_key = self.private_key.public_key()
 
     def get_public_bytes(self) -> bytes:
@@ -26,6 +30,16 @@ class Curve25519KeyExchange:
             format=serialization.PublicFormat.Raw
         )
 
+    def get_private_bytes(self) -> bytes:
+        """
+        Returns the raw private key (only for persisting the node identity — never send this).
+        """
+        return self.private_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+
     def generate_shared_key(self, peer_public_bytes: bytes) -> bytes:
         """
         Given a peer's public key in bytes, calculates the shared secret.
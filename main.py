@@ -1 +1,222 @@
 # Entry point
+# main.py
+#
+# Runs an ObscuraNet node. Only config and the stdlib are imported up front; the crypto
+# stack, each routing mode and the UI are imported the first time they are needed.
+
+import argparse
+import importlib
+import sys
+import time
+
+from config import load_settings
+
+# Routing mode -> (module, class). Modules are imported on first use.
+ROUTING_MODES = {
+    "low-latency": ("routing_modes.low_latency", "LowLatencyRouter"),
+    "onion": ("routing_modes.onion_route_pow", "OnionRouter"),
+    "dtn": ("routing_modes.opportunistic_dtn", "DTNRouter")
+}
+
+
+class StartupTimer:
+    """
+    Records wall-clock time spent in each named startup phase.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases = []  # [(name, seconds)] in the order they ran
+
+    def phase(self, name: str):
+        return _Phase(self, name)
+
+    def total(self) -> float:
+        return sum(seconds for _, seconds in self.phases)
+
+    def report(self) -> str:
+        """
+        Returns a human-readable table of phase timings.
+        """
+        lines = [f"  {name:<24} {seconds * 1000:8.2f} ms" for name, seconds in self.phases]
+        lines.append(f"  {'total':<24} {self.total() * 1000:8.2f} ms")
+        return "\n".join(lines)
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer: StartupTimer, name: str):
+        self.timer = timer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.phases.append((self.name, time.perf_counter() - self.start))
+        return False
+
+
+class NodeDaemon:
+    """
+    Long-running node process: owns one SecureNode and the routers enabled in settings.
+    Routers are constructed lazily by router(mode) unless `preload_modes` is set.
+    """
+
+    def __init__(self, settings, timer: StartupTimer = None):
+        self.settings = settings
+        self.timer = timer or StartupTimer()
+        self.node = None
+        self.store = None       # NodeStore, unless data_dir is empty (ephemeral node)
+        self.network_map = {}   # {node_id: SecureNode} used by the onion router
+        self.routers = {}       # {mode: router instance}, filled on first use
+
+        unknown = [mode for mode in settings.modes if mode not in ROUTING_MODES]
+        if unknown:
+            raise ValueError(f"Unknown routing mode(s): {', '.join(unknown)}")
+
+    def start(self):
+        """
+        Bring the node up, timing each phase.
+        """
+        with self.timer.phase("observability"):
+            from core.metrics import METRICS
+            from core.tracing import TRACER
+            if not self.settings.metrics_enabled:
+                METRICS.disable()
+            TRACER.set_sample_rate(self.settings.trace_sample_rate)
+
+        with self.timer.phase("import crypto/core"):
+            from core.secure_node import SecureNode
+
+        with self.timer.phase("node identity"):
+            if self.settings.data_dir:
+                from core.node_store import NodeStore
+                self.store = NodeStore(self.settings.data_dir, self.settings.store_key or None)
+                self.node = self.store.load_node(self.settings.node_id)
+            else:
+                self.node = SecureNode(self.settings.node_id)
+            self.node.pow.current_difficulty = self.settings.pow_difficulty
+            self.network_map[self.node.node_id] = self.node
+
+        if self.settings.preload_modes:
+            for mode in self.settings.modes:
+                self.router(mode)
+
+        if self.settings.ui:
+            with self.timer.phase("ui"):
+                self._start_ui()
+
+    def save_state(self):
+        """
+        Persist peers and sessions so the next start can skip handshakes.
+        """
+        if self.store is not None and self.node is not None:
+            self.store.save_node(self.node)
+
+    def router(self, mode: str):
+        """
+        Returns the router for `mode`, importing and constructing it on first use.
+        """
+        router = self.routers.get(mode)
+        if router is not None:
+            return router
+        if mode not in self.settings.modes:
+            raise ValueError(f"Routing mode '{mode}' is not enabled on this node.")
+
+        module_name, class_name = ROUTING_MODES[mode]
+        with self.timer.phase(f"mode {mode}"):
+            router_class = getattr(importlib.import_module(module_name), class_name)
+            if mode == "onion":
+                router = router_class(self.node, self.network_map)
+            else:
+                router = router_class(self.node)
+        self.routers[mode] = router
+        return router
+
+    def _start_ui(self):
+        main_window = importlib.import_module("ui.main_window")
+        launch = getattr(main_window, "launch", None)
+        if launch is None:
+            print("UI requested but ui.main_window provides no launch(); continuing headless.")
+            return
+        launch(self)
+
+    def status_line(self) -> str:
+        node = self.node
+        return (f"[{node.node_id}] reputation={node.reputation.get_score()} "
+                f"pow={node.pow.get_current_difficulty()} peers={len(node.peers)} "
+                f"modes={','.join(sorted(self.routers)) or '-'}")
+
+    def run(self):
+        """
+        Block until interrupted, printing a status line every `status_interval` seconds
+        and delivering status-feed deltas to subscribers (e.g. the UI).
+        """
+        interval = self.settings.status_interval
+        period = interval if interval > 0 else 3600
+        next_status = time.monotonic() + period
+        try:
+            while True:
+                feed = self.node.status_feed
+                time.sleep(min(period, feed.min_interval) if feed is not None else period)
+                if feed is not None:
+                    feed.tick()
+                if time.monotonic() >= next_status:
+                    next_status += period
+                    if interval > 0:
+                        print(self.status_line())
+                    self.save_state()
+        except KeyboardInterrupt:
+            print("Shutting down.")
+        finally:
+            self.save_state()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run an ObscuraNet node.")
+    parser.add_argument("--config", help="JSON settings file")
+    parser.add_argument("--node-id", help="node identifier")
+    parser.add_argument("--data-dir", help="directory for the node identity and peer store ('' = ephemeral)")
+    parser.add_argument("--modes", help="comma-separated routing modes (low-latency,onion,dtn)")
+    parser.add_argument("--preload-modes", action="store_true", default=None,
+                        help="import all enabled routing modes at startup")
+    parser.add_argument("--ui", action="store_true", default=None, help="launch the desktop UI")
+    parser.add_argument("--once", action="store_true", help="start, print the startup report and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    timer = StartupTimer()
+    args = parse_args(argv)
+
+    with timer.phase("settings"):
+        settings = load_settings(
+            path=args.config,
+            overrides={
+                "node_id": args.node_id,
+                "data_dir": args.data_dir,
+                "modes": args.modes,
+                "preload_modes": args.preload_modes,
+                "ui": args.ui
+            }
+        )
+
+    daemon = NodeDaemon(settings, timer)
+    daemon.start()
+
+    print(f"Node '{settings.node_id}' started in {timer.total() * 1000:.1f} ms")
+    print(timer.report())
+
+    if args.once:
+        daemon.save_state()
+    else:
+        daemon.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
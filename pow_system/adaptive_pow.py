@@ -4,6 +4,7 @@
 import hashlib
 import time
 import random
+from core.metrics import timed
 
 class AdaptivePoW:
     """
@@ -61,6 +62,7 @@ class AdaptivePoW:
             "difficulty": self.current_difficulty
         }
 
+    @timed("pow.solve")
     def solve_puzzle(self, message: str, nonce_seed: str, difficulty: int) -> tuple:
         """
         Brute-force solution: find a nonce such that
@@ -80,6 +82,7 @@ class AdaptivePoW:
 
         return str(nonce), round(time.time() - start_time, 3)
 
+    @timed("pow.verify")
     def verify_solution(self, message: str, nonce_seed: str, nonce: str, difficulty: int) -> bool:
         """
         Verify that a given solution is valid for the puzzle.
@@ -1 +1,188 @@
 # Module: latency_router
+# latency_router.py
+
+import math
+
+from routing_modes.onion_cell import CELL_SIZE as ONION_CELL_SIZE, max_payload
+
+LOW_LATENCY_LIMIT = 512     # Max bytes per LowLatencyRouter packet
+DTN_FRAGMENT_SIZE = 256     # DTNRouter.fragment_message default
+ONION_CELL_PAYLOAD = max_payload(ONION_CELL_SIZE)  # Message bytes per onion cell; longer messages use several
+AEAD_OVERHEAD = 28          # Nonce + Poly1305 tag added per encrypted packet (encrypt_bytes)
+
+# Required security level -> minimum mode rank
+SECURITY_LEVELS = {"low": 0, "normal": 1, "high": 2}
+# low-latency: direct, no cover traffic; dtn: dummy packets hide volume; onion: hides sender/receiver
+MODE_SECURITY = {"low-latency": 0, "dtn": 1, "onion": 2}
+
+
+class RoutePlan:
+    """
+    The mode chosen for one message and how it is split.
+    """
+
+    __slots__ = ("mode", "chunks", "estimate", "raw_estimate", "candidates")
+
+    def __init__(self, mode: str, chunks: int, estimate: float, raw_estimate: float, candidates: dict):
+        self.mode = mode                    # "low-latency", "onion" or "dtn"
+        self.chunks = chunks                # Number of packets (low-latency) or cells (onion) the message is split into
+        self.estimate = estimate            # Predicted delivery time (seconds)
+        self.raw_estimate = raw_estimate    # Prediction before the learned correction
+        self.candidates = candidates        # {mode: predicted seconds} for every eligible mode
+
+    def to_dict(self) -> dict:
+        return {
+            "mode": self.mode,
+            "chunks": self.chunks,
+            "estimate": self.estimate,
+            "raw_estimate": self.raw_estimate,
+            "candidates": dict(self.candidates)
+        }
+
+
+class RoutingCostModel:
+    """
+    Predicts delivery time per routing mode and picks the cheapest mode that meets the
+    required security level.
+
+    Each estimate combines link latency, serialization time, per-packet crypto cost and
+    (for onion) the expected PoW work at the current difficulty. A per-mode correction
+    factor, updated from observed latencies with an EWMA, pulls the static model towards
+    what the node actually measures.
+    """
+
+    def __init__(self, bandwidth_bps: float = 1_000_000, hash_time: float = 1.5e-6,
+                 per_packet_time: float = 30e-6, dtn_base_delay: float = 1.0,
+                 max_low_latency_chunks: int = 8, dtn_dummy_ratio: float = 0.3, alpha: float = 0.2):
+        """
+        Parameters:
+        - bandwidth_bps: assumed link bandwidth for serialization delay
+        - hash_time: seconds per SHA3-256 attempt when solving PoW
+        - per_packet_time: encrypt + hash + framing cost per packet
+        - dtn_base_delay: store-and-forward delay added to every DTN transfer
+        - max_low_latency_chunks: largest number of ≤512-byte packets a message may be split into
+          before it is treated as bulk data
+        - dtn_dummy_ratio: dummy packets added by DTN per real fragment
+        - alpha: EWMA weight given to each new latency observation
+        """
+        self.bandwidth_bps = bandwidth_bps
+        self.hash_time = hash_time
+        self.per_packet_time = per_packet_time
+        self.dtn_base_delay = dtn_base_delay
+        self.max_low_latency_chunks = max_low_latency_chunks
+        self.dtn_dummy_ratio = dtn_dummy_ratio
+        self.alpha = alpha
+        self.correction = {mode: 1.0 for mode in MODE_SECURITY}  # observed / predicted, smoothed
+        self.observations = {mode: 0 for mode in MODE_SECURITY}
+
+    def pow_time(self, difficulty: int) -> float:
+        """
+        Expected time to solve one puzzle: 16^difficulty hex-prefix attempts.
+        """
+        return (16 ** difficulty) * self.hash_time
+
+    def raw_estimate(self, mode: str, size: int, difficulty: int, link_latency: float,
+                     hops: int = 3, trusted: bool = False) -> float:
+        """
+        Uncorrected model prediction in seconds (math.inf if the mode cannot carry the message).
+        """
+        bandwidth = self.bandwidth_bps / 8.0
+
+        if mode == "low-latency":
+            chunks = max(1, math.ceil(size / LOW_LATENCY_LIMIT))
+            if chunks > self.max_low_latency_chunks:
+                return math.inf
+            wire = size + chunks * AEAD_OVERHEAD
+            return link_latency + wire / bandwidth + chunks * self.per_packet_time
+
+        if mode == "onion":
+            if hops < 1:
+                return math.inf
+            cells = max(1, math.ceil(size / ONION_CELL_PAYLOAD))
+            per_hop = link_latency + cells * (ONION_CELL_SIZE / bandwidth + self.per_packet_time)
+            if not trusted:
+                per_hop += self.pow_time(difficulty)
+            return hops * per_hop
+
+        if mode == "dtn":
+            fragments = max(1, math.ceil(size / DTN_FRAGMENT_SIZE))
+            dummies = math.ceil(fragments * self.dtn_dummy_ratio)
+            wire = size + fragments * AEAD_OVERHEAD + dummies * 192  # Dummies average 192 bytes
+            return (self.dtn_base_delay + link_latency + wire / bandwidth
+                    + (fragments + dummies) * self.per_packet_time)
+
+        raise ValueError(f"Unknown routing mode: {mode}")
+
+    def estimate(self, mode: str, size: int, difficulty: int, link_latency: float,
+                 hops: int = 3, trusted: bool = False) -> float:
+        """
+        Model prediction in seconds, scaled by the learned per-mode correction.
+        """
+        return self.raw_estimate(mode, size, difficulty, link_latency, hops, trusted) * self.correction[mode]
+
+    def plan(self, size: int, security_level: str, difficulty: int, link_latency: float,
+             hops: int = 3, trusted: bool = False, available: tuple = None) -> RoutePlan:
+        """
+        Choose the cheapest eligible mode for a message of `size` bytes.
+
+        Parameters:
+        - security_level: "low", "normal" or "high" (see SECURITY_LEVELS)
+        - available: modes the caller can actually use (e.g. onion needs a path)
+
+        Returns:
+        - RoutePlan; raises ValueError if no available mode meets the security level
+        """
+        if security_level not in SECURITY_LEVELS:
+            raise ValueError(f"Unknown security level: {security_level}")
+        required = SECURITY_LEVELS[security_level]
+
+        candidates = {}
+        for mode, rank in MODE_SECURITY.items():
+            if rank < required or (available is not None and mode not in available):
+                continue
+            cost = self.estimate(mode, size, difficulty, link_latency, hops, trusted)
+            if cost != math.inf:
+                candidates[mode] = cost
+
+        if not candidates:
+            raise ValueError(f"No routing mode can carry {size} bytes at security level '{security_level}'.")
+
+        mode = min(candidates, key=candidates.get)
+        if mode == "low-latency":
+            chunks = max(1, math.ceil(size / LOW_LATENCY_LIMIT))
+        elif mode == "onion":
+            chunks = max(1, math.ceil(size / ONION_CELL_PAYLOAD))
+        else:
+            chunks = 1
+        raw = candidates[mode] / self.correction[mode]
+        return RoutePlan(mode, chunks, candidates[mode], raw, candidates)
+
+    def observe(self, mode: str, predicted_raw: float, observed: float):
+        """
+        Feed back a measured latency for a message whose uncorrected prediction was `predicted_raw`.
+        """
+        if predicted_raw <= 0 or predicted_raw == math.inf:
+            return
+        ratio = observed / predicted_raw
+        self.correction[mode] += self.alpha * (ratio - self.correction[mode])
+        self.observations[mode] += 1
+
+
+def split_utf8(message: str, limit: int = LOW_LATENCY_LIMIT) -> list:
+    """
+    Split a string into pieces whose UTF-8 encoding is at most `limit` bytes,
+    never cutting a multi-byte character. Raises ValueError if a character is
+    longer than `limit` bytes (it could never be placed in a piece).
+    """
+    data = message.encode()
+    pieces = []
+    start = 0
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:  # Back off from a continuation byte
+            end -= 1
+        if end == start:
+            raise ValueError(f"A {limit}-byte limit cannot hold the character at byte {start}.")
+        pieces.append(data[start:end].decode())
+        start = end
+    return pieces or [""]
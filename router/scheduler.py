@@ -0,0 +1,219 @@
+# Module: scheduler
+# scheduler.py
+
+import time
+from collections import deque
+
+from core.metrics import METRICS, Histogram
+
+# Packet mode -> traffic class
+MODE_CLASSES = {
+    "low-latency": "interactive",
+    "dtn-ack": "interactive",   # Acks are tiny and pace the sender; delaying them stalls a transfer
+    "onion": "onion",
+    "dtn": "bulk"
+}
+DEFAULT_CLASS = "bulk"                              # Anything unrecognised is treated as bulk
+DEFAULT_WEIGHTS = {"onion": 4, "bulk": 1}           # DRR share of the non-priority classes
+PRIORITY_CLASSES = ("interactive",)                 # Served first, in this order
+
+
+class ClassQueue:
+    """
+    FIFO of packets for one traffic class, with its DRR state and statistics.
+    """
+
+    __slots__ = ("name", "quantum", "max_bytes", "packets", "bytes", "deficit", "in_round",
+                 "enqueued", "sent", "bytes_sent", "dropped", "delay")
+
+    def __init__(self, name: str, quantum: int, max_bytes: int = None):
+        self.name = name
+        self.quantum = quantum          # Bytes added to the deficit each DRR round
+        self.max_bytes = max_bytes      # Tail-drop limit (None = unbounded)
+        self.packets = deque()          # (packet, size, enqueued_at)
+        self.bytes = 0                  # Bytes currently queued
+        self.deficit = 0
+        self.in_round = False           # Quantum already granted for the current visit
+        self.enqueued = 0
+        self.sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.delay = Histogram(f"scheduler.{name}.queue_delay")  # ns spent queued
+
+    def stats(self) -> dict:
+        delay = self.delay.snapshot()
+        return {
+            "queued_packets": len(self.packets),
+            "queued_bytes": self.bytes,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "bytes_sent": self.bytes_sent,
+            "dropped": self.dropped,
+            "queue_delay_ms": {key[:-3]: value / 1e6 for key, value in delay.items() if key.endswith("_ns")}
+        }
+
+
+class OutboundScheduler:
+    """
+    Decides which queued packet goes to one neighbour next.
+
+    Packets are sorted into traffic classes by routing mode. Priority classes (low-latency
+    messages and DTN acks) always go first; the remaining classes share the link by deficit
+    round-robin, each receiving `quantum * weight` bytes per round, so a large DTN transfer
+    cannot hold back onion traffic and vice versa. To keep a flood of priority traffic from
+    starving everything else, after `priority_burst_bytes` of consecutive priority data one
+    DRR turn is served before priority resumes.
+
+    Routers enqueue(); the transport calls dequeue() (or drain()) whenever the link can take
+    more data. Time spent queued is recorded per class.
+    """
+
+    def __init__(self, quantum: int = 1500, weights: dict = None, priority_classes: tuple = PRIORITY_CLASSES,
+                 priority_burst_bytes: int = 64 * 1024, max_queue_bytes: dict = None,
+                 class_map: dict = None, clock=time.monotonic):
+        """
+        Parameters:
+        - quantum: DRR bytes per round for a class of weight 1
+        - weights: {class: weight} for the round-robin classes (default DEFAULT_WEIGHTS)
+        - priority_classes: classes served with strict priority, highest first
+        - priority_burst_bytes: consecutive priority bytes allowed while other classes wait
+        - max_queue_bytes: {class: byte limit}; enqueue() refuses packets beyond it
+        - class_map: {packet mode: class} (default MODE_CLASSES)
+        - clock: time source in seconds, used when callers don't pass `now`
+        """
+        if quantum < 1:
+            raise ValueError("Quantum must be at least one byte.")
+        weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        for name in priority_classes:
+            weights.pop(name, None)
+        if any(weight <= 0 for weight in weights.values()):
+            raise ValueError("Class weights must be positive.")
+
+        max_queue_bytes = max_queue_bytes or {}
+        self.class_map = dict(MODE_CLASSES if class_map is None else class_map)
+        self.priority_burst_bytes = priority_burst_bytes
+        self.clock = clock
+
+        self.priority = [ClassQueue(name, 0, max_queue_bytes.get(name)) for name in priority_classes]
+        self.classes = {queue.name: queue for queue in self.priority}
+        for name, weight in weights.items():
+            self.classes[name] = ClassQueue(name, max(1, int(quantum * weight)), max_queue_bytes.get(name))
+        if DEFAULT_CLASS not in self.classes:
+            self.classes[DEFAULT_CLASS] = ClassQueue(DEFAULT_CLASS, quantum, max_queue_bytes.get(DEFAULT_CLASS))
+
+        self.active = deque()           # Backlogged round-robin classes, in service order
+        self.priority_run = 0           # Priority bytes sent since a round-robin class was last served
+        self.queued_packets = 0
+        self.queued_bytes = 0
+
+    def __len__(self) -> int:
+        return self.queued_packets
+
+    def classify(self, packet) -> str:
+        """
+        Returns the traffic class for a packet.
+        """
+        name = self.class_map.get(packet.mode, DEFAULT_CLASS)
+        return name if name in self.classes else DEFAULT_CLASS
+
+    def enqueue(self, packet, now: float = None) -> bool:
+        """
+        Queue a packet for transmission.
+
+        Returns:
+        - True if queued, False if its class is over `max_queue_bytes` (the caller should back off)
+        """
+        queue = self.classes[self.classify(packet)]
+        size = len(packet.payload)
+        if queue.max_bytes is not None and queue.bytes + size > queue.max_bytes:
+            queue.dropped += 1
+            METRICS.inc(f"scheduler.{queue.name}.dropped")
+            return False
+
+        if not queue.packets and queue.quantum:
+            queue.deficit = 0
+            queue.in_round = False
+            self.active.append(queue)
+        queue.packets.append((packet, size, self.clock() if now is None else now))
+        queue.bytes += size
+        queue.enqueued += 1
+        self.queued_packets += 1
+        self.queued_bytes += size
+        return True
+
+    def dequeue(self, now: float = None):
+        """
+        Returns the next packet to transmit, or None if nothing is queued.
+        """
+        if not self.queued_packets:
+            return None
+
+        queue = None
+        if not self.active or self.priority_run < self.priority_burst_bytes:
+            queue = next((q for q in self.priority if q.packets), None)
+        if queue is None:
+            queue = self._next_round_robin()
+
+        packet, size, enqueued_at = queue.packets.popleft()
+        if queue.quantum:
+            self.priority_run = 0
+            queue.deficit -= size
+            if not queue.packets:  # Idle classes don't bank credit for later
+                queue.deficit = 0
+                queue.in_round = False
+                self.active.popleft()
+        else:
+            self.priority_run += size
+
+        queue.bytes -= size
+        queue.sent += 1
+        queue.bytes_sent += size
+        self.queued_packets -= 1
+        self.queued_bytes -= size
+
+        delay_ns = max(0, int(((self.clock() if now is None else now) - enqueued_at) * 1e9))
+        queue.delay.observe(delay_ns)
+        if METRICS.enabled:
+            METRICS.histogram(queue.delay.name).observe(delay_ns)
+        return packet
+
+    def _next_round_robin(self):
+        """
+        Deficit round-robin: returns the class at the head of the active list once its
+        deficit covers its head packet, rotating past classes that must wait a round.
+        """
+        active = self.active
+        while active:
+            queue = active[0]
+            if not queue.in_round:
+                queue.deficit += queue.quantum
+                queue.in_round = True
+            if queue.packets[0][1] <= queue.deficit:
+                return queue
+            queue.in_round = False  # Turn over; the remaining deficit carries into the next round
+            active.rotate(-1)
+        return None
+
+    def drain(self, byte_budget: int, now: float = None) -> list:
+        """
+        Dequeue packets until `byte_budget` bytes have been released or the queues are empty.
+        The packet that crosses the budget is included, so progress is always made.
+        """
+        packets = []
+        while byte_budget > 0:
+            packet = self.dequeue(now)
+            if packet is None:
+                break
+            packets.append(packet)
+            byte_budget -= len(packet.payload)
+        return packets
+
+    def stats(self) -> dict:
+        """
+        Returns per-class queue depth, throughput, drops and queueing delay.
+        """
+        return {
+            "queued_packets": self.queued_packets,
+            "queued_bytes": self.queued_bytes,
+            "classes": {name: queue.stats() for name, queue in self.classes.items()}
+        }
@@ -0,0 +1,154 @@
+# Module: compression
+# compression.py
+
+import bz2
+import lzma
+import math
+import time
+import zlib
+from collections import Counter
+
+# Codec ids as recorded in the DTN fragment header
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_BZ2 = 2
+CODEC_LZMA = 3
+
+CODEC_NAMES = {CODEC_NONE: "none", CODEC_ZLIB: "zlib", CODEC_BZ2: "bz2", CODEC_LZMA: "lzma"}
+
+# (codec, level) pairs tried on a sample for large payloads, cheapest first
+CANDIDATES = [(CODEC_ZLIB, 1), (CODEC_ZLIB, 6), (CODEC_BZ2, 9), (CODEC_LZMA, 6)]
+
+FAST_LINK_BPS = 50_000_000  # At or above this speed only the cheapest codec is worth its CPU time
+
+
+def _compressor(codec: int, level: int):
+    if codec == CODEC_ZLIB:
+        return zlib.compressobj(level)
+    if codec == CODEC_BZ2:
+        return bz2.BZ2Compressor(level)
+    if codec == CODEC_LZMA:
+        return lzma.LZMACompressor(preset=level)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def _decompressor(codec: int):
+    if codec == CODEC_ZLIB:
+        return zlib.decompressobj()
+    if codec == CODEC_BZ2:
+        return bz2.BZ2Decompressor()
+    if codec == CODEC_LZMA:
+        return lzma.LZMADecompressor()
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+
+def estimate_entropy(data: bytes, sample_size: int = 4096) -> float:
+    """
+    Shannon entropy (bits per byte) of a sample taken from the start, middle and end of `data`.
+    Values near 8.0 mean already-compressed or encrypted content.
+    """
+    if len(data) > sample_size:
+        third = sample_size // 3
+        middle = len(data) // 2
+        data = data[:third] + data[middle:middle + third] + data[-third:]
+    if not data:
+        return 0.0
+
+    total = len(data)
+    return -sum((n / total) * math.log2(n / total) for n in Counter(data).values())
+
+
+class AdaptiveCompressor:
+    """
+    Chooses whether and how to compress a payload before encryption.
+
+    - Tiny payloads and high-entropy samples are sent as-is.
+    - Fast links always use zlib level 1; medium payloads use zlib at a level picked from the link speed.
+    - Large payloads on slower links try every candidate codec on a sample and keep the one with
+      the lowest predicted compress + transmit time for the given link bandwidth.
+    The input and the compressed copy are both held in memory; decompression is capped at
+    the uncompressed length the sender recorded, so a small payload cannot expand without limit.
+    """
+
+    def __init__(self, min_size: int = 256, entropy_threshold: float = 7.5,
+                 trial_size: int = 16384, chunk_size: int = 65536):
+        """
+        Parameters:
+        - min_size: payloads smaller than this are never compressed
+        - entropy_threshold: skip compression when the sample entropy (bits/byte) is above this
+        - trial_size: payloads at least this large are trial-compressed on a sample of this size
+        - chunk_size: bytes fed to the compressor per call
+        """
+        self.min_size = min_size
+        self.entropy_threshold = entropy_threshold
+        self.trial_size = trial_size
+        self.chunk_size = chunk_size
+
+    def choose(self, data: bytes, link_bps: float) -> tuple:
+        """
+        Pick a codec for `data` on a link of `link_bps` bits per second.
+
+        Returns:
+        - (codec, level)
+        """
+        if len(data) < self.min_size or estimate_entropy(data) > self.entropy_threshold:
+            return CODEC_NONE, 0
+
+        # Fast links can't wait for heavy compression, and a trial would cost more than it saves
+        if link_bps >= FAST_LINK_BPS:
+            return CODEC_ZLIB, 1
+        if len(data) < self.trial_size:
+            return CODEC_ZLIB, 6 if link_bps >= 1_000_000 else 9
+
+        sample = data[:self.trial_size]
+        scale = len(data) / len(sample)
+        best, best_cost = (CODEC_NONE, 0), len(data) * 8 / link_bps
+
+        for codec, level in CANDIDATES:
+            start = time.perf_counter()
+            compressor = _compressor(codec, level)
+            size = len(compressor.compress(sample)) + len(compressor.flush())
+            cost = (time.perf_counter() - start) * scale + size * scale * 8 / link_bps
+            if cost < best_cost:
+                best, best_cost = (codec, level), cost
+
+        return best
+
+    def compress(self, data: bytes, link_bps: float = 1_000_000) -> tuple:
+        """
+        Compress `data` with the codec chosen for this link.
+
+        Returns:
+        - (codec, payload); payload is `data` unchanged when codec is CODEC_NONE
+        """
+        codec, level = self.choose(data, link_bps)
+        if codec == CODEC_NONE:
+            return CODEC_NONE, data
+
+        compressor = _compressor(codec, level)
+        view = memoryview(data)
+        parts = [compressor.compress(view[i:i + self.chunk_size]) for i in range(0, len(data), self.chunk_size)]
+        parts.append(compressor.flush())
+        payload = b"".join(parts)
+
+        if len(payload) >= len(data):
+            return CODEC_NONE, data
+        return codec, payload
+
+    def decompress(self, codec: int, payload: bytes, expected_length: int) -> bytes:
+        """
+        Reverse compress() for a payload tagged with `codec`.
+
+        Parameters:
+        - expected_length: uncompressed size recorded by the sender; the decompressor never
+          produces more than one byte past it
+
+        Raises ValueError if the output is larger or smaller than `expected_length`.
+        """
+        if codec == CODEC_NONE:
+            return payload
+
+        data = _decompressor(codec).decompress(payload, expected_length + 1)
+        if len(data) != expected_length:
+            raise ValueError(f"Decompressed size does not match the declared {expected_length} bytes.")
+        return data
@@ -0,0 +1,250 @@
+# Module: congestion
+# congestion.py
+
+from core.metrics import METRICS
+
+REORDER_THRESHOLD = 3  # A fragment is presumed lost once 3 later-sent fragments have been acked
+
+
+class PacedSender:
+    """
+    Sender-side congestion control for one DTN transfer.
+
+    Instead of handing every fragment to the link at once, the transfer is released
+    through a congestion window (AIMD: slow start, +1 fragment per RTT, halve on loss)
+    and paced so a window is spread evenly over one smoothed RTT. Losses are detected from
+    selective acks (later fragments acknowledged first) or, failing that, by RTO, and the
+    window is cut at most once per round trip. A delay guard shrinks the window while the
+    RTT sits well above the path minimum, so a bulk transfer backs off as soon as it starts
+    building queues that would delay other traffic.
+
+    The class does no I/O: the caller sends whatever poll() returns, feeds receiver
+    acknowledgements to on_ack(), and polls again at next_poll_time().
+    """
+
+    def __init__(self, packets: list, initial_window: float = 4.0, max_window: float = 512.0,
+                 min_rto: float = 0.2, max_rto: float = 60.0, initial_rto: float = 1.0,
+                 delay_threshold: float = 0.5, max_retransmits: int = 8):
+        """
+        Parameters:
+        - packets: Packet instances from DTNRouter.send_bulk (dummies are paced but never acked)
+        - initial_window: fragments allowed in flight before the first ack
+        - max_window: upper bound on the congestion window
+        - min_rto / max_rto / initial_rto: retransmission timeout bounds and start value (seconds)
+        - delay_threshold: stop growing (and slowly shrink) the window while the latest RTT
+          exceeds min RTT * (1 + delay_threshold)
+        - max_retransmits: give up on the transfer after this many resends of one fragment
+        """
+        self.queue = list(reversed(packets))   # Pop from the end: original order
+        self.retransmit_queue = []
+        self.in_flight = {}                    # {packet_id: (packet, sent_at, send sequence)}
+        self.send_seq = 0                      # Increments per real fragment transmitted
+        self.highest_acked_seq = 0
+        self.recovery_seq = 0                  # Losses of fragments sent before this don't cut the window again
+        self.transmissions = {}                # {packet_id: times sent}
+        self.acked = set()                     # Packet ids confirmed by the receiver
+        self.cwnd = float(initial_window)
+        self.ssthresh = float(max_window)
+        self.max_window = float(max_window)
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.rto = initial_rto
+        self.delay_threshold = delay_threshold
+        self.max_retransmits = max_retransmits
+
+        self.srtt = None
+        self.rttvar = None
+        self.min_rtt = None
+        self.latest_rtt = None
+        self.next_send_time = 0.0
+        self.started_at = None
+        self.last_ack_at = None
+        self.failed = False
+
+        self.bytes_sent = 0
+        self.bytes_acked = 0
+        self.packets_sent = 0
+        self.retransmits = 0
+        self.losses = 0
+
+    # ------------------------------------------------------------------ sending
+
+    @property
+    def done(self) -> bool:
+        """
+        True once every real fragment has been acknowledged (or the transfer failed).
+        """
+        return self.failed or (not self.queue and not self.retransmit_queue and not self.in_flight)
+
+    def pacing_interval(self) -> float:
+        """
+        Seconds between transmissions (no pacing before the first RTT sample).
+        The window is spread over one smoothed RTT, sent slightly faster than that
+        (2x in slow start, 1.2x afterwards) so pacing never becomes the bottleneck.
+        """
+        if self.srtt is None:
+            return 0.0
+        gain = 2.0 if self.cwnd < self.ssthresh else 1.2
+        return self.srtt / (max(self.cwnd, 1.0) * gain)
+
+    def poll(self, now: float) -> list:
+        """
+        Returns the packets that may be transmitted at time `now`.
+        Handles retransmission timeouts first, then releases new fragments within the window and pacing rate.
+        """
+        if self.started_at is None:
+            self.started_at = now
+        self._check_timeouts(now)
+
+        ready = []
+        interval = self.pacing_interval()
+        while (self.retransmit_queue or self.queue) and now >= self.next_send_time and not self.failed:
+            source = self.retransmit_queue if self.retransmit_queue else self.queue
+            packet = source[-1]
+            if packet.packet_id in self.acked:
+                source.pop()  # Acknowledged late, after it was queued for retransmission
+                continue
+            if not packet.is_dummy and len(self.in_flight) >= int(self.cwnd):
+                break
+            source.pop()
+
+            if not packet.is_dummy:
+                self.send_seq += 1
+                self.in_flight[packet.packet_id] = (packet, now, self.send_seq)
+                self.transmissions[packet.packet_id] = self.transmissions.get(packet.packet_id, 0) + 1
+
+            ready.append(packet)
+            self.packets_sent += 1
+            self.bytes_sent += len(packet.payload)
+            if interval:
+                self.next_send_time = max(self.next_send_time, now) + interval
+
+        return ready
+
+    def next_poll_time(self, now: float) -> float:
+        """
+        Earliest time at which poll() may return something new (pacing slot or oldest RTO expiry).
+        Returns None when nothing is pending.
+        """
+        times = []
+        if (self.queue or self.retransmit_queue) and len(self.in_flight) < int(self.cwnd):
+            times.append(max(now, self.next_send_time))
+        if self.in_flight:
+            times.append(min(sent_at for _, sent_at, _ in self.in_flight.values()) + self.rto)
+        return min(times) if times else None
+
+    # ------------------------------------------------------------------ feedback
+
+    def on_ack(self, packet_ids: list, now: float):
+        """
+        Process a receiver acknowledgement listing delivered packet ids.
+        """
+        for packet_id in packet_ids:
+            if packet_id in self.acked or packet_id not in self.transmissions:
+                continue  # Duplicate or unknown
+            self.acked.add(packet_id)
+            entry = self.in_flight.pop(packet_id, None)
+            self.last_ack_at = now
+
+            if entry is not None:
+                packet, sent_at, seq = entry
+                self.highest_acked_seq = max(self.highest_acked_seq, seq)
+                self.bytes_acked += len(packet.payload)
+                if self.transmissions[packet_id] == 1:  # Karn's rule: skip RTT samples of resent fragments
+                    self._update_rtt(now - sent_at)
+            else:
+                # Timed out and queued for resend, but the original copy arrived after all
+                self.bytes_acked += next(len(p.payload) for p in self.retransmit_queue if p.packet_id == packet_id)
+
+            queue_building = self._queue_building()
+            window_limited = len(self.in_flight) + 1 >= self.cwnd / 2.0
+            if not window_limited and not queue_building:
+                continue  # Growing a window the sender isn't using would only license a later burst
+            if self.cwnd < self.ssthresh:
+                if queue_building:
+                    # Leave slow start at the estimated path capacity, but never cut deeper than a loss would
+                    self.cwnd = max(2.0, self.cwnd / 2.0, self.cwnd * self.min_rtt / self.latest_rtt)
+                    self.ssthresh = self.cwnd
+                else:
+                    self.cwnd += 1.0                    # Slow start
+            elif queue_building:
+                self.cwnd = max(2.0, self.cwnd - 1.0 / self.cwnd)  # Drain the queue: -1 fragment per RTT
+                self.ssthresh = min(self.ssthresh, self.cwnd)      # ...without falling back into slow start
+            else:
+                self.cwnd += 1.0 / self.cwnd            # Congestion avoidance: +1 fragment per RTT
+            self.cwnd = min(self.cwnd, self.max_window)
+
+        lost = [entry for entry in self.in_flight.values()
+                if entry[2] + REORDER_THRESHOLD <= self.highest_acked_seq]
+        if lost:
+            self._on_loss(lost, now)
+
+    def _queue_building(self) -> bool:
+        return (self.latest_rtt is not None
+                and self.latest_rtt > self.min_rtt * (1.0 + self.delay_threshold))
+
+    def _update_rtt(self, sample: float):
+        """
+        RFC 6298 smoothing of RTT samples into SRTT, RTTVAR and RTO.
+        """
+        if self.srtt is None:
+            self.srtt = sample
+            self.rttvar = sample / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - sample)
+            self.srtt = 0.875 * self.srtt + 0.125 * sample
+        self.latest_rtt = sample
+        self.min_rtt = sample if self.min_rtt is None else min(self.min_rtt, sample)
+        self.rto = min(self.max_rto, max(self.min_rto, self.srtt + 4 * self.rttvar))
+
+    def _check_timeouts(self, now: float):
+        expired = [entry for entry in self.in_flight.values() if now - entry[1] >= self.rto]
+        if expired:
+            self.rto = min(self.max_rto, self.rto * 2)   # Back off until a fresh RTT sample arrives
+            self._on_loss(expired, now)
+
+    def _on_loss(self, entries: list, now: float):
+        """
+        Queue lost fragments for retransmission and apply the multiplicative decrease,
+        once per round trip however many fragments were lost in it.
+        """
+        if max(seq for _, _, seq in entries) > self.recovery_seq:
+            self.ssthresh = max(self.cwnd / 2.0, 2.0)
+            self.cwnd = self.ssthresh
+            self.recovery_seq = self.send_seq
+            self.losses += 1
+            METRICS.inc("dtn.congestion_losses")
+
+        for packet, _, _ in entries:
+            if self.transmissions[packet.packet_id] > self.max_retransmits:
+                self.failed = True
+                return
+            del self.in_flight[packet.packet_id]
+            self.retransmit_queue.append(packet)
+            self.retransmits += 1
+        self.next_send_time = now
+
+    # ------------------------------------------------------------------ reporting
+
+    def stats(self) -> dict:
+        """
+        Returns window, RTT and goodput statistics for the transfer.
+        """
+        elapsed = (self.last_ack_at - self.started_at) if self.last_ack_at is not None else 0.0
+        return {
+            "cwnd": round(self.cwnd, 2),
+            "ssthresh": round(self.ssthresh, 2),
+            "in_flight": len(self.in_flight),
+            "srtt": self.srtt,
+            "rttvar": self.rttvar,
+            "min_rtt": self.min_rtt,
+            "rto": self.rto,
+            "packets_sent": self.packets_sent,
+            "retransmits": self.retransmits,
+            "loss_events": self.losses,       # Window reductions
+            "bytes_sent": self.bytes_sent,
+            "bytes_acked": self.bytes_acked,
+            "goodput_bps": self.bytes_acked * 8 / elapsed if elapsed > 0 else 0.0,
+            "done": self.done,
+            "failed": self.failed
+        }
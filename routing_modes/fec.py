@@ -0,0 +1,158 @@
+# Module: fec
+# fec.py
+#
+# Systematic Reed-Solomon erasure coding over GF(2^8) for DTN fragments.
+# Byte-wise field multiplication is done with bytes.translate() against a 256-entry
+# table per coefficient and XOR accumulation on Python ints, so whole fragments are
+# processed in C without an extra dependency such as NumPy.
+
+MAX_SHARDS = 255  # Data + parity shards per block (limit of the Cauchy construction in GF(256))
+
+# GF(2^8) with the primitive polynomial x^8 + x^4 + x^3 + x^2 + 1 (0x11d)
+GF_EXP = [0] * 512
+GF_LOG = [0] * 256
+
+_x = 1
+for _i in range(255):
+    GF_EXP[_i] = _x
+    GF_LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x100:
+        _x ^= 0x11d
+for _i in range(255, 512):
+    GF_EXP[_i] = GF_EXP[_i - 255]
+
+
+def gf_mul(a: int, b: int) -> int:
+    if a == 0 or b == 0:
+        return 0
+    return GF_EXP[GF_LOG[a] + GF_LOG[b]]
+
+
+def gf_inv(a: int) -> int:
+    if a == 0:
+        raise ZeroDivisionError("0 has no inverse in GF(256)")
+    return GF_EXP[255 - GF_LOG[a]]
+
+
+# MUL_TABLES[c] maps every byte x to c·x; used with bytes.translate()
+MUL_TABLES = [bytes(gf_mul(c, x) for x in range(256)) for c in range(256)]
+
+
+def _mul_add(acc: int, coefficient: int, shard: bytes) -> int:
+    """
+    acc ^= coefficient · shard, with both sides held as little-endian ints.
+    """
+    if coefficient == 0:
+        return acc
+    if coefficient != 1:
+        shard = shard.translate(MUL_TABLES[coefficient])
+    return acc ^ int.from_bytes(shard, "little")
+
+
+def _invert(matrix: list) -> list:
+    """
+    Gauss-Jordan inversion of a square matrix over GF(256).
+    """
+    n = len(matrix)
+    rows = [list(row) + [1 if i == j else 0 for j in range(n)] for i, row in enumerate(matrix)]
+
+    for col in range(n):
+        pivot = next((r for r in range(col, n) if rows[r][col]), None)
+        if pivot is None:
+            raise ValueError("Singular matrix — shards are not independent.")
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+
+        inv = gf_inv(rows[col][col])
+        rows[col] = [gf_mul(inv, v) for v in rows[col]]
+        for r in range(n):
+            factor = rows[r][col]
+            if r != col and factor:
+                rows[r] = [v ^ gf_mul(factor, p) for v, p in zip(rows[r], rows[col])]
+
+    return [row[n:] for row in rows]
+
+
+class ReedSolomonCodec:
+    """
+    Systematic (k + m) erasure code: the k data shards are sent as-is, followed by m
+    parity shards. Any k of the k + m shards rebuild the data.
+
+    Parity row j uses the Cauchy coefficients 1 / (x_j + y_i) with x_j = k + j and y_i = i,
+    so every square submatrix is invertible and any k shards suffice.
+    """
+
+    def __init__(self, data_shards: int, parity_shards: int):
+        if data_shards < 1:
+            raise ValueError("At least one data shard is required.")
+        if parity_shards < 0 or data_shards + parity_shards > MAX_SHARDS:
+            raise ValueError(f"Data + parity shards must be between 1 and {MAX_SHARDS}.")
+        self.k = data_shards
+        self.m = parity_shards
+        self.coefficients = [
+            [gf_inv((data_shards + j) ^ i) for i in range(data_shards)]
+            for j in range(parity_shards)
+        ]
+
+    def encode(self, shards: list) -> list:
+        """
+        Compute the parity shards.
+
+        Parameters:
+        - shards: k byte strings of equal length
+
+        Returns:
+        - List of m parity byte strings
+        """
+        if len(shards) != self.k:
+            raise ValueError(f"Expected {self.k} data shards, got {len(shards)}.")
+        size = len(shards[0])
+        parity = []
+        for row in self.coefficients:
+            acc = 0
+            for coefficient, shard in zip(row, shards):
+                acc = _mul_add(acc, coefficient, shard)
+            parity.append(acc.to_bytes(size, "little"))
+        return parity
+
+    def decode(self, received: dict) -> list:
+        """
+        Rebuild the data shards from any k received shards.
+
+        Parameters:
+        - received: {shard index: bytes}; indexes 0..k-1 are data, k..k+m-1 parity
+
+        Returns:
+        - List of the k data shards, in order
+        Raises ValueError if fewer than k shards are available.
+        """
+        k = self.k
+        missing = [i for i in range(k) if i not in received]
+        if not missing:
+            return [received[i] for i in range(k)]
+
+        parity_rows = [i - k for i in sorted(received) if i >= k][:len(missing)]
+        if len(parity_rows) < len(missing):
+            raise ValueError(f"Need {k} shards to rebuild the block, have {len(received)}.")
+
+        size = len(next(iter(received.values())))
+        present = [i for i in range(k) if i in received]
+
+        # Each parity shard minus the known data contributions leaves a combination of the missing shards
+        residuals = []
+        for j in parity_rows:
+            acc = int.from_bytes(received[k + j], "little")
+            for i in present:
+                acc = _mul_add(acc, self.coefficients[j][i], received[i])
+            residuals.append(acc.to_bytes(size, "little"))
+
+        inverse = _invert([[self.coefficients[j][i] for i in missing] for j in parity_rows])
+
+        data = dict((i, received[i]) for i in present)
+        for row, index in zip(inverse, missing):
+            acc = 0
+            for coefficient, residual in zip(row, residuals):
+                acc = _mul_add(acc, coefficient, residual)
+            data[index] = acc.to_bytes(size, "little")
+
+        return [data[i] for i in range(k)]
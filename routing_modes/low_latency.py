@@ -3,6 +3,21 @@
 
 from core.packet import Packet
 from core.secure_node import SecureNode
+from core.metrics import timed
+from core.tracing import TRACER
+
+LOW_LATENCY_AAD = b"low-latency"
+
+
+def chunk_aad(metadata: dict) -> bytes:
+    """
+    Associated data for one low-latency packet. Pieces of a split message bind their
+    msg_id, chunk index and chunk count, so relabelled pieces fail to decrypt.
+    """
+    if not metadata or metadata.get("msg_id") is None:
+        return LOW_LATENCY_AAD
+    return LOW_LATENCY_AAD + f"|{metadata['msg_id']}|{metadata['chunk']}|{metadata['chunks']}".encode()
+
 
 class LowLatencyRouter:
     """
@@ -16,10 +31,13 @@ class LowLatencyRouter:
         """
         self.node = node
 
-    def send(self, receiver_id: str, message: str) -> Packet:
+    @timed("mode.low-latency.send")
+    def send(self, receiver_id: str, message: str, metadata: dict = None) -> Packet:
         """
         Encrypts and wraps a message into a low-latency packet.
         Returns a Packet object to be sent directly to receiver.
+        `metadata` is copied into the packet (e.g. chunk fields from SecureNode.send_auto);
+        its msg_id, chunk and chunks fields are authenticated along with the message.
         """
         if len(message.encode()) > 512:
             raise ValueError("Low-latency mode supports only messages <= 512 bytes.")
@@ -27,35 +45,97 @@ class LowLatencyRouter:
         if receiver_id not in self.node.peers:
             raise Exception("Receiver public key not found. Establish session first.")
 
-        # Encrypt message using secure node’s ChaCha20 session
-        packet_data = self.node.send_message(message, aad=b"low-latency")
+        # Encrypt message using the receiver's ChaCha20 session (nonce travels with the ciphertext)
+        trace_id = TRACER.sample()
+        self.node.use_session(receiver_id)
+        payload = self.node.encrypt_bytes(message.encode(), aad=chunk_aad(metadata), trace_id=trace_id)
+        metadata = dict(metadata or {})
+        if trace_id:
+            metadata["trace_id"] = trace_id
 
         # Wrap in a Packet
         packet = Packet(
             sender_id=self.node.node_id,
             receiver_id=receiver_id,
-            payload=packet_data["ciphertext"],
+            payload=payload,
             is_dummy=False,
-            mode="low-latency"
+            mode="low-latency",
+            metadata=metadata
         )
 
         return packet
 
+    @timed("mode.low-latency.receive")
     def receive(self, packet: Packet) -> str:
         """
         Decrypts and returns the message content from a low-latency packet.
+        Raises if the payload or its chunk fields were changed in transit.
         """
         if packet.mode != "low-latency":
             raise Exception("Packet mode mismatch. Expected low-latency.")
 
-        # Rebuild packet into dictionary form expected by SecureNode
-        packet_dict = {
-            "from": packet.sender_id,
-            "nonce": b"",  # Needs to be tracked/stored in real transmission
-            "aad": b"low-latency",
-            "ciphertext": packet.payload,
-            "hash": ""
-        }
-
-        # This is a placeholder — in practice, you'll transmit nonce + hash too
-        return self.node.receive_message(packet_dict)
+        self.node.use_session(packet.sender_id)
+        plain = self.node.decrypt_bytes(packet.payload, aad=chunk_aad(packet.metadata),
+                                        trace_id=TRACER.trace_id_of(packet))
+        return plain.decode()
+
+
+class ChunkReassembler:
+    """
+    Receive-side counterpart of SecureNode.send_auto's low-latency splitting.
+
+    Each piece carries metadata {"msg_id", "chunk", "chunks"}; pieces are decrypted as they
+    arrive (in any order) and the message is returned once all of them are present.
+    The chunk fields are authenticated by the piece's AEAD, so a relabelled piece fails
+    to decrypt. Packets without chunk metadata are delivered as they are.
+    """
+
+    def __init__(self, router: LowLatencyRouter, max_pending: int = 1024):
+        """
+        Parameters:
+        - router: LowLatencyRouter used to decrypt each piece
+        - max_pending: incomplete messages kept at once; the oldest is dropped beyond this
+        """
+        self.router = router
+        self.max_pending = max_pending
+        self.pending = {}  # {(sender_id, msg_id): (chunks, {chunk index: text})}, in arrival order
+
+    def add(self, packet: Packet) -> str:
+        """
+        Accept one packet.
+
+        Returns:
+        - The complete message, or None while pieces are still missing
+        Raises ValueError for a piece whose chunk fields are out of range or disagree with
+        the pieces already held, and if the piece fails to decrypt.
+        """
+        msg_id = packet.metadata.get("msg_id")
+        if msg_id is None:
+            return self.router.receive(packet)
+        chunk = packet.metadata.get("chunk")
+        chunks = packet.metadata.get("chunks")
+        if not (isinstance(chunks, int) and isinstance(chunk, int) and 0 <= chunk < chunks):
+            raise ValueError(f"Invalid chunk {chunk!r} of {chunks!r} for message {msg_id}.")
+
+        key = (packet.sender_id, msg_id)
+        entry = self.pending.get(key)
+        if entry is not None and entry[0] != chunks:
+            raise ValueError(f"Piece of message {msg_id} claims {chunks} chunks; earlier pieces said {entry[0]}.")
+        try:
+            text = self.router.receive(packet)  # Authenticates msg_id, chunk and chunks
+        except Exception as e:
+            raise ValueError(f"Piece {chunk} of message {msg_id} failed authentication.") from e
+        if chunks == 1:
+            return text
+
+        if entry is None:
+            if len(self.pending) >= self.max_pending:
+                del self.pending[next(iter(self.pending))]
+            entry = self.pending[key] = (chunks, {})
+        pieces = entry[1]
+        pieces[chunk] = text
+
+        if len(pieces) < chunks:
+            return None
+        del self.pending[key]
+        return "".join(pieces[i] for i in range(chunks))
@@ -0,0 +1,92 @@
+# Module: onion_cell
+# onion_cell.py
+#
+# Fixed-size onion cells. Every onion packet is exactly `cell_size` bytes on every link:
+#
+#   cell  = nonce (12) | body (cell_size - 12)
+#   body  = length (2) | sealed message (12-byte nonce + ciphertext + 16-byte tag) | zero padding
+#
+# A hop peels its layer by XORing a ChaCha20 keystream (its cell key, the cell's nonce)
+# over the whole cell in place, with the nonce field zeroed first, so the first 12 keystream
+# bytes become the nonce for the next hop. Layers carry no per-hop tag, so the size never
+# changes and reveals nothing about a hop's position; the message itself is sealed once with
+# ChaCha20-Poly1305 for the destination, which detects any change to the nonces or the message.
+
+import struct
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms
+
+from core.metrics import METRICS
+from crypto_engine.hash_utils import derive_key_hkdf
+
+CELL_SIZE = 1024                        # Bytes per onion cell on the wire
+CELL_NONCE_SIZE = 12                    # Per-hop nonce at the front of the cell
+LENGTH_FIELD = struct.Struct("<H")      # Length of the sealed message
+SEAL_OVERHEAD = 12 + 16                 # encrypt_bytes(): nonce + Poly1305 tag
+CELL_KEY_INFO = b"ObscuraNet Onion Cell"
+
+_ZERO_NONCE = bytes(CELL_NONCE_SIZE)
+_COUNTER = bytes(4)                     # ChaCha20 block counter starts at 0 for every layer
+
+
+def max_payload(cell_size: int = CELL_SIZE) -> int:
+    """
+    Largest message (in bytes) that fits in one cell of `cell_size`.
+    """
+    return cell_size - CELL_NONCE_SIZE - LENGTH_FIELD.size - SEAL_OVERHEAD
+
+
+def derive_cell_key(session_key: bytes) -> bytes:
+    """
+    Key for the unauthenticated cell layer, kept separate from the session's AEAD key.
+    """
+    return derive_key_hkdf(shared_secret=session_key, info=CELL_KEY_INFO)
+
+
+def apply_layer(cell: memoryview, key: bytes):
+    """
+    Peel (or add) one layer in place: XOR the keystream for (key, cell nonce) over the cell,
+    leaving the next hop's nonce in the nonce field. Costs the same for every cell.
+    """
+    nonce = _COUNTER + bytes(cell[:CELL_NONCE_SIZE])
+    cell[:CELL_NONCE_SIZE] = _ZERO_NONCE
+    Cipher(algorithms.ChaCha20(key, nonce), mode=None).encryptor().update_into(cell, cell)
+
+
+class BufferPool:
+    """
+    Free list of equally-sized bytearrays, so building and peeling cells does not
+    allocate a new buffer per packet. Buffers are zeroed when returned.
+    """
+
+    def __init__(self, size: int, capacity: int = 64):
+        """
+        Parameters:
+        - size: bytes per buffer
+        - capacity: maximum number of idle buffers kept for reuse
+        """
+        self.size = size
+        self.capacity = capacity
+        self.free = []
+        self.allocated = 0     # Buffers created because the free list was empty
+        self.reused = 0        # Buffers handed out from the free list
+        self._zeros = bytes(size)
+
+    def acquire(self) -> bytearray:
+        if self.free:
+            self.reused += 1
+            return self.free.pop()
+        self.allocated += 1
+        METRICS.inc("onion.pool.allocated")
+        return bytearray(self.size)
+
+    def release(self, buffer: bytearray):
+        buffer[:] = self._zeros  # Same length, so the buffer is overwritten in place
+        if len(self.free) < self.capacity:
+            self.free.append(buffer)
+
+    def stats(self) -> dict:
+        return {"size": self.size, "idle": len(self.free), "allocated": self.allocated, "reused": self.reused}
+
+
+CELL_POOL = BufferPool(CELL_SIZE)  # Shared by every OnionRouter using the default cell size
@@ -1,91 +1,227 @@
 # Module: onion_route_pow
 # onion_route_pow.py
 
-import random
+import os
 from core.packet import Packet
 from core.secure_node import SecureNode
+from core.metrics import timed
+from core.tracing import TRACER
+from router.latency_router import split_utf8
+from routing_modes.onion_cell import (CELL_NONCE_SIZE, CELL_POOL, CELL_SIZE, LENGTH_FIELD, BufferPool,
+                                      apply_layer, derive_cell_key, max_payload)
+
+ONION_AAD = b"onion-route"
+
+
+def onion_aad(metadata: dict) -> bytes:
+    """
+    Associated data for the destination seal. Cells of a split message bind their msg_id,
+    chunk index and chunk count, so relabelled or mixed-up cells fail to open.
+    """
+    if not metadata or metadata.get("msg_id") is None:
+        return ONION_AAD
+    return ONION_AAD + f"|{metadata['msg_id']}|{metadata['chunk']}|{metadata['chunks']}".encode()
 
 class OnionRouter:
     """
     Implements multi-hop onion routing with adaptive proof-of-work.
     Used for high-security messages (authentication, critical data).
+
+    Packets are fixed-size cells (see onion_cell): every hop sees `cell_size` bytes whatever
+    the message length or its position on the path, and layers are added and peeled in place
+    inside buffers taken from a shared pool.
     """
 
-    def __init__(self, node: SecureNode, network_map: dict):
+    def __init__(self, node: SecureNode, network_map: dict, cell_size: int = CELL_SIZE, pool: BufferPool = None):
         """
         node: SecureNode instance (this node)
         network_map: {node_id: SecureNode instance} for simulated multi-hop routing
+        cell_size: bytes per onion cell (all routers on a path must agree)
+        pool: buffer pool for cells (default: the shared pool for this cell size)
         """
+        if max_payload(cell_size) < 4:  # Room for at least one UTF-8 character of any length
+            raise ValueError(f"Cell size {cell_size} leaves no room for a message.")
+        if pool is None:
+            pool = CELL_POOL if cell_size == CELL_SIZE else BufferPool(cell_size)
+        elif pool.size != cell_size:
+            raise ValueError("Buffer pool size must match the cell size.")
         self.node = node
         self.network_map = network_map
+        self.cell_size = cell_size
+        self.pool = pool
+        self.cell_keys = {}  # {peer_id: (session key, derived cell key)}
 
-    def create_onion_message(self, path: list, final_message: str) -> Packet:
+    def _cell_key(self, peer_id: str) -> bytes:
         """
-        Constructs a layered packet where each node only sees the next hop and one layer of encryption.
+        Establish (or reuse) the session with a peer and return its cell-layer key.
+        Leaves that peer's session active on the node.
+        """
+        self.node.establish_session(peer_id, self.network_map[peer_id].get_public_key())
+        session_key = self.node.session_keys[peer_id]
+        cached = self.cell_keys.get(peer_id)
+        if cached is None or cached[0] != session_key:
+            cached = self.cell_keys[peer_id] = (session_key, derive_cell_key(session_key))
+        return cached[1]
+
+    @timed("mode.onion.send")
+    def create_onion_message(self, path: list, final_message: str, metadata: dict = None) -> Packet:
+        """
+        Constructs a layered cell where each node only sees the next hop and one layer of encryption.
 
         path: ordered list of node_ids (including destination at the end)
-        final_message: actual message to be delivered at the end
+        final_message: actual message to be delivered at the end (at most max_payload(cell_size) bytes)
+        metadata: extra packet metadata (e.g. chunk position from create_onion_messages);
+                  msg_id, chunk and chunks are authenticated by the destination seal
         """
         message = final_message.encode()
-        aad = b"onion-route"
+        limit = max_payload(self.cell_size)
+        if len(message) > limit:
+            raise ValueError(f"Onion cells carry at most {limit} bytes; message is {len(message)}.")
+        trace_id = TRACER.sample()  # None unless this packet is sampled for tracing
+
+        keys = [self._cell_key(peer_id) for peer_id in path[1:]]  # Exclude sender (self)
+        # The destination's session is the last one established, so this seal is for it alone
+        sealed = self.node.encrypt_bytes(message, aad=onion_aad(metadata), trace_id=trace_id)
 
-        for peer_id in reversed(path[1:]):  # Exclude sender (self)
-            # Establish session with each peer (if not done already)
-            peer_public_key = self.network_map[peer_id].get_public_key()
-            self.node.establish_session(peer_id, peer_public_key)
+        buffer = self.pool.acquire()
+        try:
+            with memoryview(buffer) as cell:
+                first_nonce = os.urandom(CELL_NONCE_SIZE)
+                cell[:CELL_NONCE_SIZE] = first_nonce
+                LENGTH_FIELD.pack_into(buffer, CELL_NONCE_SIZE, len(sealed))
+                start = CELL_NONCE_SIZE + LENGTH_FIELD.size
+                cell[start:start + len(sealed)] = sealed
 
-            # Encrypt the current message layer with that peer's key
-            layer = self.node.send_message(message.decode(), aad=aad)
-            message = layer["ciphertext"]  # Each layer becomes the new inner payload
+                # Applying every hop's layer in path order walks the same nonce chain the hops
+                # will see; the keystreams XOR together, so the body ends up fully wrapped
+                for peer_id, key in zip(path[1:], keys):
+                    with TRACER.span(trace_id, "onion.wrap", node_id=self.node.node_id, layer_for=peer_id):
+                        apply_layer(cell, key)
+                cell[:CELL_NONCE_SIZE] = first_nonce
+            payload = bytes(buffer)
+        finally:
+            self.pool.release(buffer)
+
+        metadata = dict(metadata or {})
+        if trace_id:
+            metadata["trace_id"] = trace_id
 
         # Final payload is encrypted for first hop
         return Packet(
             sender_id=self.node.node_id,
             receiver_id=path[1],
-            payload=message,
+            payload=payload,
             is_dummy=False,
-            mode="onion"
+            mode="onion",
+            metadata=metadata or None
         )
 
+    def create_onion_messages(self, path: list, final_message: str) -> list:
+        """
+        Like create_onion_message(), but for messages of any length: the message is split into
+        pieces of at most max_payload(cell_size) bytes, each sent in its own cell. Pieces of a
+        split message carry metadata {"msg_id", "chunk", "chunks"} for process_packets().
+
+        Returns:
+        - List of Packet (a single cell when the message fits in one)
+        """
+        pieces = split_utf8(final_message, max_payload(self.cell_size))
+        if len(pieces) == 1:
+            return [self.create_onion_message(path, pieces[0])]
+        msg_id = os.urandom(8).hex()
+        return [self.create_onion_message(path, piece, {"msg_id": msg_id, "chunk": i, "chunks": len(pieces)})
+                for i, piece in enumerate(pieces)]
+
+    def process_packets(self, packets: list, path: list) -> str:
+        """
+        Deliver the cells of one message built by create_onion_messages() (in any order)
+        and return the reassembled message, or the first error string.
+
+        The cells must share one msg_id and chunk count and carry each index 0..chunks-1
+        exactly once. Those labels are sealed with the message, so a cell only opens under
+        the labels it was created with.
+        """
+        if not packets:
+            return "Error: no cells to deliver."
+        labels = [packet.metadata or {} for packet in packets]
+        msg_id = labels[0].get("msg_id")
+        chunks = labels[0].get("chunks", 1)
+        if any(label.get("msg_id") != msg_id or label.get("chunks", 1) != chunks for label in labels):
+            return "Error: cells belong to more than one message."
+        indexes = [label.get("chunk", 0) for label in labels]
+        if not all(isinstance(index, int) for index in indexes) or sorted(indexes) != list(range(chunks)):
+            return f"Error: expected cells 0..{chunks - 1} once each, got {indexes}."
+
+        pieces = [None] * chunks
+        for packet, index in zip(packets, indexes):
+            ok, text = self._process_cell(packet, path)
+            if not ok:
+                return text
+            pieces[index] = text
+        return "".join(pieces)
+
     def process_packet(self, packet: Packet, path: list) -> str:
         """
         Simulate processing a packet through each node in the path.
-        Each hop decrypts one layer and passes it to the next.
+        Each hop peels one layer in place and passes the cell on; the destination opens the seal.
+        Returns the message, or a string starting with "Error" if the cell could not be delivered.
+        """
+        return self._process_cell(packet, path)[1]
+
+    @timed("mode.onion.receive")
+    def _process_cell(self, packet: Packet, path: list) -> tuple:
         """
-        current_payload = packet.payload
-        aad = b"onion-route"
-
-        for hop in path[1:]:
-            # Each node decrypts its layer
-            self.node.establish_session(hop, self.network_map[hop].get_public_key())
-            encrypted_layer = {
-                "from": self.node.node_id,
-                "nonce": b"",  # In a real network, these must be passed
-                "aad": aad,
-                "ciphertext": current_payload,
-                "hash": ""     # For testing only
-            }
-
-            try:
-                # Solve PoW before processing (skip if trusted)
-                if not self.node.pow.is_trusted(hop):
-                    puzzle = self.node.pow.generate_puzzle("forward packet")
-                    solution, _ = self.node.pow.solve_puzzle(
-                        puzzle["message"],
-                        puzzle["nonce_seed"],
-                        puzzle["difficulty"]
-                    )
-                    assert self.node.pow.verify_solution(
-                        puzzle["message"],
-                        puzzle["nonce_seed"],
-                        solution,
-                        puzzle["difficulty"]
-                    )
-
-                # Decrypt this layer
-                decrypted = self.node.receive_message(encrypted_layer)
-                current_payload = decrypted.encode()  # Prepare for next hop
-            except Exception as e:
-                return f"Error during hop '{hop}': {e}"
-
-        return decrypted
+        process_packet() with its own failure signal, so a message that happens to start
+        with "Error" is not mistaken for one.
+
+        Returns:
+        - (True, message) or (False, error description)
+        """
+        if len(packet.payload) != self.cell_size:
+            return False, f"Error: onion cell must be {self.cell_size} bytes, got {len(packet.payload)}."
+        trace_id = TRACER.trace_id_of(packet)
+
+        buffer = self.pool.acquire()
+        try:
+            with memoryview(buffer) as cell:
+                cell[:] = packet.payload
+
+                for hop in path[1:]:
+                    with TRACER.span(trace_id, "onion.hop", node_id=hop) as hop_span:
+                        try:
+                            # Solve PoW before processing (skip if trusted)
+                            if not self.node.pow.is_trusted(hop):
+                                with TRACER.span(trace_id, "onion.pow", node_id=hop):
+                                    puzzle = self.node.pow.generate_puzzle("forward packet")
+                                    solution, _ = self.node.pow.solve_puzzle(
+                                        puzzle["message"],
+                                        puzzle["nonce_seed"],
+                                        puzzle["difficulty"]
+                                    )
+                                    assert self.node.pow.verify_solution(
+                                        puzzle["message"],
+                                        puzzle["nonce_seed"],
+                                        solution,
+                                        puzzle["difficulty"]
+                                    )
+
+                            # Peel this layer
+                            apply_layer(cell, self._cell_key(hop))
+                        except Exception as e:
+                            hop_span.set("error", str(e))
+                            return False, f"Error during hop '{hop}': {e}"
+
+                # Destination: the remaining body is the sealed message
+                (length,) = LENGTH_FIELD.unpack_from(buffer, CELL_NONCE_SIZE)
+                start = CELL_NONCE_SIZE + LENGTH_FIELD.size
+                try:
+                    if length > self.cell_size - start:
+                        raise ValueError("length field out of range")
+                    decrypted = self.node.decrypt_bytes(bytes(cell[start:start + length]),
+                                                        aad=onion_aad(packet.metadata), trace_id=trace_id)
+                except Exception:
+                    return False, f"Error at destination '{path[-1]}': cell was modified in transit."
+        finally:
+            self.pool.release(buffer)
+
+        return True, decrypted.decode()
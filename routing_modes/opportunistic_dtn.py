@@ -3,25 +3,45 @@
 
 from core.packet import Packet
 from core.secure_node import SecureNode
+from core.metrics import METRICS, timed
+from core.tracing import TRACER
+from routing_modes.fec import ReedSolomonCodec, MAX_SHARDS
+from routing_modes.compression import AdaptiveCompressor, CODEC_NONE, CODEC_NAMES
+from routing_modes.congestion import PacedSender
 import math
+import os
 import random
+import struct
+
+# Prepended to every fragment before encryption:
+# version, transfer id, payload length, uncompressed length, block number, block count,
+# shard index, data shards (k), parity shards (m), compression codec
+FRAGMENT_HEADER = struct.Struct("<B8sIIIIBBBB")
+FRAGMENT_VERSION = 3
+FEC_BLOCK_SIZE = 64  # Data fragments per erasure-coded block
 
 class DTNRouter:
     """
     Delay-Tolerant Networking (DTN) Router for large file transfers.
     Splits data into fragments and mixes with dummy packets for traffic obfuscation.
+    Optionally adds Reed-Solomon parity fragments so a transfer survives lost fragments
+    without waiting for retransmission.
     """
 
-    def __init__(self, node: SecureNode):
+    def __init__(self, node: SecureNode, compressor: AdaptiveCompressor = None):
         self.node = node
+        self.compressor = compressor or AdaptiveCompressor()  # Pre-encryption compression stage
 
+    @timed("dtn.fragment")
     def fragment_message(self, message: bytes, fragment_size: int = 256) -> list:
         """
         Splits a large message into fixed-size fragments.
         """
         return [message[i:i + fragment_size] for i in range(0, len(message), fragment_size)]
 
-    def send_bulk(self, receiver_id: str, message: str, dummy_ratio: float = 0.3) -> list:
+    @timed("mode.dtn.send")
+    def send_bulk(self, receiver_id: str, message: str, dummy_ratio: float = 0.3, fec_ratio: float = 0.0,
+                  compress: bool = True, link_bps: float = 1_000_000) -> list:
         """
         Sends a bulk message by splitting into encrypted packets with dummy traffic.
 
@@ -29,26 +49,61 @@ class DTNRouter:
         - receiver_id: Destination node
         - message: The large string message
         - dummy_ratio: Percentage of dummy packets to add (0.3 = 30%)
+        - fec_ratio: Parity fragments per data fragment (0.25 = any 20% of a block's fragments may be lost)
+        - compress: Compress before encryption when it pays off (see AdaptiveCompressor)
+        - link_bps: Expected link speed, used to pick the compression codec
 
         Returns:
         - List of Packet instances (real + dummy, shuffled)
         """
+        if fec_ratio < 0:
+            raise ValueError("FEC ratio cannot be negative.")
+        self.node.use_session(receiver_id)
+
         aad = b"dtn-mode"
-        message_bytes = message.encode()
-        fragments = self.fragment_message(message_bytes)
+        trace_id = TRACER.sample()  # All fragments of one transfer share a trace
+        metadata = {"trace_id": trace_id} if trace_id else None
+        raw_bytes = message_bytes = message.encode()
+        codec = CODEC_NONE
+        if compress:
+            start_ns = METRICS.start()
+            with TRACER.span(trace_id, "dtn.compress", node_id=self.node.node_id, size=len(raw_bytes)) as span:
+                codec, message_bytes = self.compressor.compress(raw_bytes, link_bps)
+                span.set("codec", CODEC_NAMES[codec])
+            METRICS.observe_since("dtn.compress", start_ns)
+            METRICS.inc("dtn.bytes_before_compression", len(raw_bytes))
+            METRICS.inc("dtn.bytes_after_compression", len(message_bytes))
+        with TRACER.span(trace_id, "dtn.fragment", node_id=self.node.node_id, size=len(message_bytes)):
+            fragments = self.fragment_message(message_bytes)
         packets = []
 
-        # Create real packets
-        for fragment in fragments:
-            encrypted = self.node.send_message(fragment.decode('latin1'), aad=aad)
-            packet = Packet(
-                sender_id=self.node.node_id,
-                receiver_id=receiver_id,
-                payload=encrypted["ciphertext"],
-                is_dummy=False,
-                mode="dtn"
-            )
-            packets.append(packet)
+        transfer_id = os.urandom(8)
+        block_count = math.ceil(len(fragments) / FEC_BLOCK_SIZE)
+
+        # Create real packets, one erasure-coded block at a time
+        for block in range(block_count):
+            data = fragments[block * FEC_BLOCK_SIZE:(block + 1) * FEC_BLOCK_SIZE]
+            parity_count = min(math.ceil(len(data) * fec_ratio), MAX_SHARDS - len(data))
+            if parity_count:
+                with TRACER.span(trace_id, "dtn.fec_encode", node_id=self.node.node_id, parity=parity_count):
+                    width = len(data[0])
+                    data = [fragment.ljust(width, b"\x00") for fragment in data]
+                    data += ReedSolomonCodec(len(data), parity_count).encode(data)
+                METRICS.inc("dtn.fec_parity_sent", parity_count)
+
+            for index, shard in enumerate(data):
+                header = FRAGMENT_HEADER.pack(FRAGMENT_VERSION, transfer_id, len(message_bytes), len(raw_bytes),
+                                              block, block_count, index, len(data) - parity_count, parity_count,
+                                              codec)
+                packet = Packet(
+                    sender_id=self.node.node_id,
+                    receiver_id=receiver_id,
+                    payload=self.node.encrypt_bytes(header + shard, aad=aad, trace_id=trace_id),
+                    is_dummy=False,
+                    mode="dtn",
+                    metadata=dict(metadata) if metadata else None
+                )
+                packets.append(packet)
 
         # Create dummy packets
         num_dummies = math.ceil(len(packets) * dummy_ratio)
@@ -59,41 +114,129 @@ class DTNRouter:
                 receiver_id=receiver_id,
                 payload=dummy_data,
                 is_dummy=True,
-                mode="dtn"
+                mode="dtn",
+                metadata=dict(metadata) if metadata else None
             )
             packets.append(packet)
 
         random.shuffle(packets)  # Obfuscate order
         return packets
 
+    @timed("mode.dtn.receive")
     def receive_bulk(self, packets: list) -> str:
         """
         Reassembles the original message by filtering real packets and decrypting them.
+        Fragments may arrive in any order; lost fragments are rebuilt from parity when
+        the sender used fec_ratio > 0.
 
         Parameters:
-        - packets: List of Packet instances
+        - packets: List of Packet instances (one transfer)
 
         Returns:
         - Reconstructed full message (str)
+        Raises ValueError if a block lost more fragments than its parity can replace, or if
+        real fragments were given but none of them decrypted (wrong receiver, no session, corruption).
         """
-        real_fragments = []
+        aad = b"dtn-mode"
+        blocks = {}         # {block: {shard index: bytes}}
+        layout = {}         # {block: (data shards, parity shards)}
+        transfers = set()
+        message_length = raw_length = block_count = 0
+        codec = CODEC_NONE
+        trace_id = None
+        real_fragments = 0
+
         for pkt in packets:
             if pkt.is_dummy:
                 continue
-
-            # Simulate minimal metadata packet
-            pkt_dict = {
-                "from": pkt.sender_id,
-                "nonce": b"",       # Placeholder — should be sent with packet
-                "aad": b"dtn-mode",
-                "ciphertext": pkt.payload,
-                "hash": ""
-            }
+            real_fragments += 1
+            trace_id = trace_id or TRACER.trace_id_of(pkt)
 
             try:
-                part = self.node.receive_message(pkt_dict)
-                real_fragments.append(part)
+                if self.node.shared_key != self.node.session_keys.get(pkt.sender_id):
+                    self.node.use_session(pkt.sender_id)
+                plain = self.node.decrypt_bytes(pkt.payload, aad=aad, trace_id=TRACER.trace_id_of(pkt))
+                version, transfer_id, message_length, raw_length, block, block_count, index, k, m, codec = \
+                    FRAGMENT_HEADER.unpack_from(plain)
+                if version != FRAGMENT_VERSION:
+                    raise ValueError(f"Unsupported fragment version {version}")
             except Exception as e:
+                METRICS.inc("dtn.fragments_dropped")
                 continue  # Drop failed fragments
 
-        return ''.join(real_fragments)
+            transfers.add(transfer_id)
+            blocks.setdefault(block, {})[index] = plain[FRAGMENT_HEADER.size:]
+            layout[block] = (k, m)
+
+        if real_fragments and not transfers:
+            raise ValueError("No DTN fragment could be decrypted")
+        if len(transfers) > 1:
+            raise ValueError("Packets belong to more than one DTN transfer.")
+
+        start_ns = METRICS.start()
+        with TRACER.span(trace_id, "dtn.reassemble", node_id=self.node.node_id, blocks=block_count):
+            parts = []
+            for block in range(block_count):
+                if block not in blocks:
+                    raise ValueError(f"DTN block {block} lost entirely.")
+                k, m = layout[block]
+                received = blocks[block]
+                missing = sum(1 for i in range(k) if i not in received)
+                if missing:
+                    with TRACER.span(trace_id, "dtn.fec_decode", node_id=self.node.node_id, missing=missing):
+                        parts.extend(ReedSolomonCodec(k, m).decode(received))
+                    METRICS.inc("dtn.fec_recovered", missing)
+                else:
+                    parts.extend(received[i] for i in range(k))
+            payload = b"".join(parts)[:message_length]
+            if codec != CODEC_NONE:
+                with TRACER.span(trace_id, "dtn.decompress", node_id=self.node.node_id, codec=CODEC_NAMES[codec]):
+                    payload = self.compressor.decompress(codec, payload, raw_length)
+            message = payload.decode()
+        METRICS.observe_since("dtn.reassemble", start_ns)
+        return message
+
+    def open_transfer(self, receiver_id: str, message: str, window: dict = None, **send_options) -> PacedSender:
+        """
+        Prepare a bulk message for paced, congestion-controlled transmission.
+
+        Parameters:
+        - window: keyword arguments for PacedSender (initial_window, max_window, ...)
+        - send_options: forwarded to send_bulk (dummy_ratio, fec_ratio, compress, link_bps)
+
+        Returns:
+        - PacedSender; transmit what its poll() returns and feed read_ack() results to on_ack()
+        """
+        packets = self.send_bulk(receiver_id, message, **send_options)
+        return PacedSender(packets, **(window or {}))
+
+    def build_ack(self, packets: list, receiver_id: str = None) -> Packet:
+        """
+        Acknowledge received fragments (receiver side). Dummy packets are never acknowledged.
+
+        Returns:
+        - Encrypted "dtn-ack" Packet listing the delivered packet ids
+        """
+        ids = [pkt.packet_id for pkt in packets if not pkt.is_dummy]
+        receiver_id = receiver_id or (packets[0].sender_id if packets else "")
+        self.node.use_session(receiver_id)
+        return Packet(
+            sender_id=self.node.node_id,
+            receiver_id=receiver_id,
+            payload=self.node.encrypt_bytes("\n".join(ids).encode(), aad=b"dtn-ack"),
+            is_dummy=False,
+            mode="dtn-ack"
+        )
+
+    def read_ack(self, ack: Packet) -> list:
+        """
+        Decrypt an acknowledgement from build_ack() (sender side).
+
+        Returns:
+        - List of acknowledged packet ids
+        """
+        if ack.mode != "dtn-ack":
+            raise Exception("Packet mode mismatch. Expected dtn-ack.")
+        self.node.use_session(ack.sender_id)
+        data = self.node.decrypt_bytes(ack.payload, aad=b"dtn-ack")
+        return data.decode().split("\n") if data else []
@@ -0,0 +1 @@
+# Module: __init__
@@ -0,0 +1,85 @@
+# Module: event_queue
+# event_queue.py
+
+import heapq
+
+
+class VirtualClock:
+    """
+    Simulated time in seconds. Only the event queue moves it forward.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def advance_to(self, t: float):
+        """
+        Move the clock forward to time `t`. Time never runs backwards.
+        """
+        if t < self.now:
+            raise ValueError("Virtual clock cannot move backwards.")
+        self.now = t
+
+
+class EventQueue:
+    """
+    Heap-based discrete-event scheduler.
+    Events are (time, sequence, callback, args); the sequence number keeps
+    same-time events in scheduling order and avoids comparing callbacks.
+    """
+
+    def __init__(self, clock: VirtualClock = None):
+        self.clock = clock or VirtualClock()
+        self._heap = []
+        self._seq = 0
+        self.processed = 0  # Number of events executed so far
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule_at(self, t: float, callback, *args):
+        """
+        Run callback(*args) at absolute virtual time `t`.
+        """
+        if t < self.clock.now:
+            t = self.clock.now
+        self._seq += 1
+        heapq.heappush(self._heap, (t, self._seq, callback, args))
+
+    def schedule(self, delay: float, callback, *args):
+        """
+        Run callback(*args) `delay` seconds from now.
+        """
+        self.schedule_at(self.clock.now + delay, callback, *args)
+
+    def run(self, until: float = None, max_events: int = None) -> int:
+        """
+        Execute events in time order.
+
+        Parameters:
+        - until: stop before the first event later than this virtual time (default: drain the queue)
+        - max_events: stop after this many events (default: no limit)
+
+        Returns:
+        - Number of events executed in this call
+        """
+        heap = self._heap
+        clock = self.clock
+        executed = 0
+
+        while heap:
+            if max_events is not None and executed >= max_events:
+                break
+            t, _, callback, args = heap[0]
+            if until is not None and t > until:
+                break
+            heapq.heappop(heap)
+            clock.now = t
+            callback(*args)
+            executed += 1
+
+        # Reaching `until` (rather than the event cap) means the clock has covered that whole span
+        if until is not None and clock.now < until and (max_events is None or executed < max_events):
+            clock.now = until
+        self.processed += executed
+        return executed
@@ -0,0 +1,50 @@
+from core.secure_node import SecureNode
+
+# Step 1: Create three nodes and a session from A to C
+node_a = SecureNode("NodeA")
+node_b = SecureNode("NodeB")
+node_c = SecureNode("NodeC")
+node_a.establish_session("NodeC", node_c.get_public_key())
+node_a.record_link_latency("NodeC", 0.03)
+
+# Step 2: Let the dispatcher pick a mode for different message sizes
+for size in (100, 1500, 50000):
+    result = node_a.send_auto("NodeC", "x" * size)
+    plan = result["plan"]
+    print(f"{size} bytes -> {plan.mode} ({plan.chunks} chunk(s), {len(result['packets'])} packet(s), "
+          f"~{plan.estimate * 1000:.1f} ms)")
+
+# Step 3: High security forces onion routing through the given path
+network = {"NodeA": node_a, "NodeB": node_b, "NodeC": node_c}
+result = node_a.send_auto("NodeC", "secret", security_level="high",
+                          path=["NodeA", "NodeB", "NodeC"], network_map=network)
+print("High security ->", result["plan"].mode)
+
+# Step 4: Feed back slow low-latency deliveries; the model shifts medium messages to DTN
+plan = node_a.send_auto("NodeC", "x" * 1500)["plan"]
+for _ in range(20):
+    node_a.record_delivery(plan, observed=3.0)
+print("After slow low-latency observations ->", node_a.send_auto("NodeC", "x" * 1500)["plan"].mode)
+
+# Step 5: The dispatcher encrypts for the receiver even after another session was opened
+node_c.establish_session("NodeA", node_a.get_public_key())
+node_a.establish_session("NodeB", node_b.get_public_key())
+packets = node_a.send_auto("NodeC", "x" * 50000)["packets"]
+print("Encrypted for NodeC:", node_a.shared_key == node_a.session_keys["NodeC"])
+from routing_modes.opportunistic_dtn import DTNRouter
+print("NodeC decrypts:", DTNRouter(node_c).receive_bulk(packets) == "x" * 50000)
+try:
+    node_a.send_auto("NodeZ", "hello")
+except Exception as e:
+    print("Unknown receiver:", e)
+
+# Step 6: High-security messages longer than one onion cell are split across several cells
+from routing_modes.onion_route_pow import OnionRouter
+long_message = "é" * 2500  # 5,000 bytes of two-byte characters
+result = node_a.send_auto("NodeC", long_message, security_level="high",
+                          path=["NodeA", "NodeB", "NodeC"], network_map=network)
+print("Long high-security message ->", result["plan"].mode, result["plan"].chunks, "cells,",
+      {len(packet.payload) for packet in result["packets"]}, "bytes each")
+delivered = OnionRouter(node_a, network).process_packets(list(reversed(result["packets"])), ["NodeA", "NodeB", "NodeC"])
+assert delivered == long_message and len(result["packets"]) == result["plan"].chunks
+print("Reassembled:", delivered == long_message)
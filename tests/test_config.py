@@ -0,0 +1,28 @@
+from config import NodeSettings, load_settings
+
+# Step 1: Defaults
+defaults = NodeSettings()
+print("Default settings:", defaults.to_dict())
+
+# Step 2: Environment values are parsed to the field's type
+env = {
+    "OBSCURANET_NODE_ID": "relay-7",
+    "OBSCURANET_MODES": "onion, dtn",
+    "OBSCURANET_PRELOAD_MODES": "yes",
+    "OBSCURANET_TRACE_SAMPLE_RATE": "0.05"
+}
+settings = load_settings(env=env)
+print("Node ID:", settings.node_id)
+print("Modes:", settings.modes)
+print("Preload modes?", settings.preload_modes)
+print("Trace sample rate:", settings.trace_sample_rate)
+
+# Step 3: Explicit overrides win over the environment
+settings = load_settings(env=env, overrides={"node_id": "cli-node", "modes": None})
+print("Overridden Node ID:", settings.node_id, "| Modes kept from env:", settings.modes)
+
+# Step 4: Bad values are rejected
+try:
+    load_settings(env={"OBSCURANET_POW_DIFFICULTY": "hard"})
+except ValueError as e:
+    print("Rejected:", e)
@@ -30,3 +30,12 @@ reconstructed = receiver_router.receive_bulk(packets)
 print("\nOriginal Message Start:", large_message[:100], "...")
 print("Reconstructed Message Start:", reconstructed[:100], "...")
 print("✅ Match:", reconstructed == large_message)
+
+# Step 8: A receiver that cannot decrypt any fragment gets an error, not an empty message
+outsider = SecureNode("OutsiderNode")
+outsider.establish_session("SenderNode", SecureNode("ImpostorNode").get_public_key())
+try:
+    DTNRouter(outsider).receive_bulk(packets)
+    print("Outsider read an empty message")
+except ValueError as e:
+    print("Outsider rejected:", e)
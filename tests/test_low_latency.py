@@ -1,5 +1,5 @@
 from core.secure_node import SecureNode
-from routing_modes.low_latency import LowLatencyRouter
+from routing_modes.low_latency import ChunkReassembler, LowLatencyRouter
 
 # Step 1: Create two secure nodes (simulating two devices in the network)
 node_a = SecureNode("NodeA")
@@ -39,3 +39,27 @@ received_message = node_b.receive_message(incoming_packet_dict)
 # Step 6: Output the result
 print("Original Message Sent:", message)
 print("Decrypted Message Received:", received_message)
+
+# Step 7: The packet itself now carries its nonce, so B can decrypt it directly
+print("Direct receive:", router_b.receive(packet))
+
+# Step 8: A 1500-byte message is split into tagged pieces; B rebuilds it from any arrival order
+long_message = "é" * 750
+pieces = node_a.send_auto("NodeB", long_message)["packets"]
+print("Pieces:", [(p.metadata["chunk"], p.metadata["chunks"]) for p in pieces])
+reassembler = ChunkReassembler(router_b)
+results = [reassembler.add(p) for p in reversed(pieces)]
+print("Reassembled:", results[-1] == long_message, "(incomplete before the last piece:", results[:-1], ")")
+
+# Step 9: Chunk labels are authenticated; relabelled or out-of-range pieces are rejected
+pieces = node_a.send_auto("NodeB", "A" * 512 + "B" * 512 + "C" * 100)["packets"]
+pieces[0].metadata["chunk"], pieces[1].metadata["chunk"] = 1, 0
+pieces[2].metadata["chunk"] = 7
+reassembler = ChunkReassembler(router_b)
+for piece in pieces:
+    try:
+        reassembler.add(piece)
+        print("Accepted a tampered piece")
+    except ValueError as e:
+        print("Rejected:", e)
+assert not reassembler.pending
@@ -0,0 +1,27 @@
+from core.metrics import MetricsRegistry, timed
+
+# Step 1: Create a private registry so the shared one is left untouched
+registry = MetricsRegistry()
+
+# Step 2: Count some events and time a few operations
+registry.inc("packets.sent", 3)
+
+@timed("demo.work", registry=registry)
+def work(n):
+    return sum(range(n))
+
+for n in (10, 1000, 100000):
+    work(n)
+
+snapshot = registry.snapshot()
+print("Counters:", snapshot["counters"])
+print("Work calls:", snapshot["histograms"]["demo.work"]["count"])
+print("Work p50 (ns):", snapshot["histograms"]["demo.work"]["p50_ns"])
+
+# Step 3: Disable the registry — timed calls should no longer be recorded
+registry.disable()
+work(10)
+print("Calls after disable (still 3):", registry.snapshot()["histograms"]["demo.work"]["count"])
+
+# Step 4: Export as JSON
+print("Exported:", registry.export_json()[:80], "...")
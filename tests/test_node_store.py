@@ -0,0 +1,49 @@
+import tempfile
+import time
+
+from core.node_store import NodeStore, PeerStore
+
+# Step 1: Start a node with an empty data directory — a new identity is created
+data_dir = tempfile.mkdtemp(prefix="obscuranet-")
+store = NodeStore(data_dir)
+node = store.load_node("RelayNode")
+original_public_key = node.get_public_key()
+
+# Step 2: Establish sessions with a few peers, then persist them
+peers = {f"Peer{i}": NodeStore(tempfile.mkdtemp()).load_node(f"Peer{i}") for i in range(3)}
+for peer_id, peer in peers.items():
+    node.establish_session(peer_id, peer.get_public_key())
+node.peer_reputation["Peer0"] = 130
+store.save_node(node)
+
+# Step 3: "Restart" — load the node again from the same directory
+start = time.perf_counter()
+restarted = store.load_node("RelayNode")
+elapsed_ms = (time.perf_counter() - start) * 1000
+
+print("Same identity after restart?", restarted.get_public_key() == original_public_key)
+print("Restored peers:", sorted(restarted.peers))
+print("Session keys restored?", restarted.session_keys == node.session_keys)
+print("Peer0 reputation:", restarted.peer_reputation["Peer0"])
+print(f"Warm restart load time: {elapsed_ms:.2f} ms")
+
+# Step 4: A different identity cannot unseal the stored session keys
+other = NodeStore(tempfile.mkdtemp())
+other_store = other.peer_store(other.load_identity())
+records = PeerStore(store.peer_store(b"\x00" * 32).path, other_store.sealer.get_key()).load()
+print("Sessions readable with the wrong identity?", any(r.session_key for r in records))
+
+# Step 5: A peer id too long for a record is skipped instead of failing the whole save
+node.establish_session("P" * 70, peers["Peer1"].get_public_key())
+print("Skipped on save:", store.save_node(node), "| restored:", len(store.load_node("RelayNode").peers))
+
+# Step 6: With a storage secret, the identity file alone no longer unseals session keys
+secret_dir = tempfile.mkdtemp(prefix="obscuranet-")
+secret_store = NodeStore(secret_dir, storage_secret="correct horse")
+secret_node = secret_store.load_node("RelayNode")
+secret_node.establish_session("Peer0", peers["Peer0"].get_public_key())
+secret_store.save_node(secret_node)
+without = NodeStore(secret_dir).load_node("RelayNode")
+with_secret = NodeStore(secret_dir, storage_secret="correct horse").load_node("RelayNode")
+print("Session key without the secret?", without.session_keys.get("Peer0") is not None)
+print("Session key with the secret?", with_secret.session_keys.get("Peer0") == secret_node.session_keys["Peer0"])
@@ -0,0 +1,66 @@
+import time
+
+from core.packet import Packet
+from core.secure_node import SecureNode
+from routing_modes.onion_cell import CELL_POOL, CELL_SIZE, max_payload
+from routing_modes.onion_route_pow import OnionRouter
+
+# Step 1: Six nodes; trust the relays so the demo measures cell handling rather than PoW
+names = ["NodeA", "NodeB", "NodeC", "NodeD", "NodeE", "NodeF"]
+network = {name: SecureNode(name) for name in names}
+router = OnionRouter(node=network["NodeA"], network_map=network)
+for name in names[1:]:
+    router.node.pow.mark_as_trusted(name)
+
+# Step 2: Packets are one cell long whatever the path length or message size
+for path in (names[:2], names[:3], names):
+    for message in ("hi", "x" * max_payload()):
+        packet = router.create_onion_message(path, message)
+        assert len(packet.payload) == CELL_SIZE
+        assert router.process_packet(packet, path) == message
+    print(f"{len(path) - 1} hop(s): cell = {len(packet.payload)} bytes")
+
+# Step 3: Flipping one bit of the nonce or the sealed message is caught at the destination
+packet = router.create_onion_message(names, "tamper test")
+for position in (5, 40):
+    tampered = bytearray(packet.payload)
+    tampered[position] ^= 1
+    forged = Packet(packet.sender_id, packet.receiver_id, bytes(tampered), mode="onion")
+    print(f"Bit flipped at byte {position}:", router.process_packet(forged, names))
+
+# Step 4: Oversized messages are refused instead of growing the cell
+try:
+    router.create_onion_message(names, "x" * (max_payload() + 1))
+except ValueError as e:
+    print("Oversized message rejected:", e)
+
+# Step 5: Buffers come from the pool, so repeated traffic stops allocating
+start = time.perf_counter()
+for _ in range(200):
+    router.process_packet(router.create_onion_message(names, "pooled"), names)
+elapsed = time.perf_counter() - start
+print(f"200 messages over {len(names) - 1} hops: {elapsed / 200 * 1e6:.0f} µs each")
+print("Pool:", CELL_POOL.stats())
+
+# Step 6: A message that itself starts with "Error" is delivered in full, not taken for a failure
+report = "Error report: " + "r" * 2000
+cells = router.create_onion_messages(names, report)
+assert router.process_packets(cells, names) == report
+print(f"'Error report' message: {len(cells)} cells, delivered intact")
+
+# Step 7: Cell labels are sealed with the message; relabelled or duplicated cells are refused
+cells = router.create_onion_messages(names, "1" * 982 + "2" * 982)
+cells[0].metadata["chunk"], cells[1].metadata["chunk"] = 1, 0
+print("Swapped labels:", router.process_packets(cells, names))
+cells = router.create_onion_messages(names, "1" * 982 + "2" * 982)
+print("Duplicated cell:", router.process_packets([cells[0], cells[0]], names))
+other = router.create_onion_messages(names, "3" * 1964)
+print("Mixed messages:", router.process_packets([cells[0], other[1]], names))
+
+# Step 8: Cells too small for a 4-byte UTF-8 character are refused instead of looping forever
+try:
+    OnionRouter(node=network["NodeA"], network_map=network, cell_size=45)
+except ValueError as e:
+    print("Tiny cell rejected:", e)
+small = OnionRouter(node=network["NodeA"], network_map=network, cell_size=46)
+print("Smallest cell, emoji text:", len(small.create_onion_messages(names, "😀" * 3)), "cells")
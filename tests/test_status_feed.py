@@ -0,0 +1,62 @@
+import os
+import time
+
+from core.metrics import METRICS
+from core.secure_node import SecureNode
+from ui.node_status_widget import NodeStatusModel
+
+# Step 1: A relay that already knows 20,000 peers (restored without handshakes)
+relay = SecureNode("RelayNode")
+for i in range(20000):
+    relay.restore_peer(f"peer-{i}", os.urandom(32), reputation=100, last_seen=1_700_000_000.0)
+
+# Step 2: Subscribe a UI model; the first delta is the full peer table
+model = NodeStatusModel()
+deltas = []
+
+
+def on_delta(delta):
+    deltas.append(delta)
+    model.apply(delta)
+
+
+METRICS.inc("dispatch.dtn", 5)  # Traffic from before the UI attached
+subscription = relay.subscribe_status(on_delta, min_interval=0.5)
+relay.status_feed.tick(now=0.0)
+print("Initial snapshot:", len(deltas[-1]["peers"]), "peers, full =", deltas[-1]["full"])
+assert deltas[-1]["counters"] == {}
+
+# Step 3: A few changes arrive; repeated updates to one peer are coalesced
+relay.set_peer_reputation("peer-7", 110)
+relay.set_peer_reputation("peer-7", 125)
+relay.record_link_latency("peer-42", 0.030)
+relay.remove_peer("peer-99")
+relay.pow.adjust_difficulty(under_attack=True, network_congested=False)
+METRICS.inc("mode.low-latency.send", 40)
+relay.record_link_latency("stranger", 0.050)  # Not a peer: no row is published for it
+
+print("Delivered before the throttle interval:", relay.status_feed.tick(now=0.2))
+relay.status_feed.tick(now=0.6)
+delta = deltas[-1]
+print("Delta peers:", delta["peers"])
+print("Removed:", delta["peers_removed"], "Node:", delta["node"], "Counters:", delta["counters"])
+assert delta["peers"]["peer-7"] == {"reputation": 125}
+assert model.peers["peer-7"]["reputation"] == 125 and "peer-99" not in model.peers
+assert delta["counters"] == {"mode.low-latency.send": 40}  # Counted since subscribing, not lifetime totals
+assert "stranger" not in model.peers
+
+# Step 4: Nothing changed, nothing sent
+print("Idle tick delivers:", relay.status_feed.tick(now=5.0))
+
+# Step 5: Delta cost tracks the change, full snapshots track the table
+start = time.perf_counter()
+for _ in range(100):
+    relay.get_status()
+snapshot_cost = (time.perf_counter() - start) / 100
+start = time.perf_counter()
+for i in range(100):
+    relay.set_peer_reputation(f"peer-{i}", 90)
+    subscription.poll(now=10.0 + i, force=True)
+delta_cost = (time.perf_counter() - start) / 100
+print(f"get_status(): {snapshot_cost * 1e6:.0f} µs, one-peer delta: {delta_cost * 1e6:.0f} µs")
+print("Model:", model.summary())
@@ -0,0 +1,32 @@
+from core.secure_node import SecureNode
+from core.tracing import TRACER
+from routing_modes.opportunistic_dtn import DTNRouter
+
+# Step 1: Trace every packet for this run
+TRACER.clear()
+TRACER.set_sample_rate(1.0)
+
+# Step 2: Set up two nodes with a session, as in test_dtn
+sender = SecureNode("SenderNode")
+receiver = SecureNode("ReceiverNode")
+sender.establish_session("ReceiverNode", receiver.get_public_key())
+receiver.establish_session("SenderNode", sender.get_public_key())
+
+# Step 3: Send and receive a bulk message; every fragment carries the same trace id
+packets = DTNRouter(sender).send_bulk("ReceiverNode", "Traced bulk message. " * 40)
+trace_id = packets[0].metadata["trace_id"]
+DTNRouter(receiver).receive_bulk(packets)
+
+spans = TRACER.spans(trace_id)
+print("Trace id:", trace_id)
+print("Spans recorded:", len(spans))
+print("Stages:", sorted({span.name for span in spans}))
+
+# Step 4: Export the timeline as Chrome trace-event JSON
+chrome = TRACER.export_chrome_trace(trace_id)
+print("Chrome events:", len(chrome["traceEvents"]))
+
+# Step 5: Turn sampling back off — new packets are no longer traced
+TRACER.set_sample_rate(0.0)
+untraced = DTNRouter(sender).send_bulk("ReceiverNode", "Untraced message.")
+print("Untraced packet metadata:", untraced[0].metadata)
@@ -1 +1,22 @@
 # Module: main_window
+# main_window.py
+
+from ui.node_status_widget import NodeStatusModel
+
+
+def launch(daemon, min_interval: float = 1.0) -> NodeStatusModel:
+    """
+    Attach the status view to a started NodeDaemon.
+
+    No widget toolkit is bundled yet, so the view renders each status delta as a text line;
+    the NodeStatusModel it returns is what a graphical window would draw from.
+    The daemon's run loop drives the feed, so this returns immediately.
+    """
+    model = NodeStatusModel()
+
+    def render(delta):
+        changed = model.apply(delta)
+        print(f"[{daemon.node.node_id}] {model.summary()} changed_peers={len(changed)}")
+
+    daemon.node.subscribe_status(render, min_interval)
+    return model
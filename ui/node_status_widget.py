@@ -1 +1,55 @@
 # Module: node_status_widget
+# node_status_widget.py
+
+
+class NodeStatusModel:
+    """
+    Data behind the node status widget, kept up to date from StatusFeed deltas.
+
+    The model holds the peer table, the node's own fields and the latest throughput
+    rates. apply() reports which peer rows changed, so a view only redraws those rows.
+    It has no toolkit dependency and can back any widget or a text view.
+    """
+
+    def __init__(self):
+        self.peers = {}     # {peer_id: {"reputation", "last_seen", "latency"}}
+        self.node = {}      # {"reputation", "pow_difficulty", "peer_count"}
+        self.rates = {}     # {counter name: events per second over the last delta}
+        self.totals = {}    # {counter name: events since subscribing}
+        self.last_seq = 0
+
+    def apply(self, delta: dict) -> set:
+        """
+        Merge one delta into the model.
+
+        Returns:
+        - Set of peer ids whose rows were added, changed or removed
+        """
+        if delta["full"]:
+            self.peers = {}
+        changed = set(delta["peers_removed"]) | set(delta["peers"])
+
+        for peer_id in delta["peers_removed"]:
+            self.peers.pop(peer_id, None)
+        for peer_id, fields in delta["peers"].items():
+            row = self.peers.get(peer_id)
+            if row is None:
+                self.peers[peer_id] = dict(fields)
+            else:
+                row.update(fields)
+
+        self.node.update(delta["node"])
+        interval = delta["interval"]
+        self.rates = {name: count / interval for name, count in delta["counters"].items()} if interval > 0 else {}
+        for name, count in delta["counters"].items():
+            self.totals[name] = self.totals.get(name, 0) + count
+        self.last_seq = delta["seq"]
+        return changed
+
+    def summary(self) -> str:
+        """
+        One-line description of the node for a status bar.
+        """
+        sends = sum(rate for name, rate in self.rates.items() if name.endswith(".send"))
+        return (f"reputation={self.node.get('reputation')} pow={self.node.get('pow_difficulty')} "
+                f"peers={self.node.get('peer_count', len(self.peers))} send_rate={sends:.1f}/s")